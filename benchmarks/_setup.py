@@ -0,0 +1,46 @@
+"""
+Minimal django setup to run benchmarks from the repo root, like `python benchmarks/bench_dispatch.py`.
+Only needs django installed, with an in-memory sqlite DB.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def setup(**overrides):
+    """
+    To configure django with `overrides` of settings (like `ACTION_*` settings, which are read when corelib is imported),
+    and create tables.
+    """
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    options = dict(
+        SECRET_KEY='benchmark',
+        INSTALLED_APPS=['django.contrib.auth', 'django.contrib.contenttypes', 'django.contrib.sessions',
+                        'corelib.permission', 'corelib.recorder'],
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+        USE_TZ=False,
+        DEFAULT_AUTO_FIELD='django.db.models.AutoField',
+    )
+    options.update(overrides)
+    settings.configure(**options)
+    django.setup()
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def compare(funcs, number, repeat=15):
+    """
+    To time each function of dict `funcs` by turns, so that they suffer the same noise of a shared machine.
+    Returns a dict of the best time in microseconds per call.
+    """
+    import timeit
+    results = {name: [] for name in funcs}
+    for _ in range(repeat):
+        for name, func in funcs.items():
+            results[name].append(timeit.timeit(func, number=number))
+    return {name: min(times) / number * 1e6 for name, times in results.items()}
@@ -0,0 +1,46 @@
+"""
+Parsing cost of `DatetimeType`/`DateType` values: `datetime.strptime` on each value as before,
+against the cached parsers of `datetime_parsing` (`fromisoformat` for ISO formats, a compiled regex for others,
+still `strptime` for formats of other directives like '%b').
+
+    python benchmarks/bench_datetime.py
+
+100k values for each format. Results of both are checked to be the same.
+"""
+from datetime import datetime, timedelta
+import _setup
+
+_setup.setup()
+
+from corelib.api_base.datetime_parsing import get_datetime_parser, get_date_parser  # noqa: E402
+
+N = 100000  # Values of each format.
+
+CASES = [
+    ('DatetimeType', '%Y-%m-%d %H:%M:%S', get_datetime_parser, lambda value, format: datetime.strptime(value, format)),
+    ('DatetimeType', '%d/%m/%Y %H:%M', get_datetime_parser, lambda value, format: datetime.strptime(value, format)),
+    ('DatetimeType', '%b %d %Y %H:%M', get_datetime_parser, lambda value, format: datetime.strptime(value, format)),
+    ('DateType', '%Y-%m-%d', get_date_parser, lambda value, format: datetime.strptime(value, format).date()),
+]
+
+
+def make_values(format):
+    base = datetime(2024, 1, 1)
+    return [(base + timedelta(seconds=i * 977)).strftime(format) for i in range(N)]
+
+
+def main():
+    for label, format, get_parser, legacy_parse in CASES:
+        values = make_values(format)
+        parse = get_parser(format)
+        assert [parse(v) for v in values] == [legacy_parse(v, format) for v in values], format
+        t = _setup.compare({
+            'before': lambda: [legacy_parse(v, format) for v in values],
+            'after': lambda: [parse(v) for v in values],
+        }, 1, repeat=3)
+        name = f"{label} '{format}':"
+        print(f"{name:36s}strptime {t['before'] / 1000:.0f}ms, now {t['after'] / 1000:.0f}ms ({t['before'] / t['after']:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
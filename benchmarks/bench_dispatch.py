@@ -0,0 +1,86 @@
+"""
+Dispatch overhead of `APIIngressBase` per request: `load_action` and `authenticate` as shipped, which look up
+the precompiled dispatch table (`ActionDispatch` records), against the dispatch steps before it (copied below as `legacy_dispatch`).
+
+    python benchmarks/bench_dispatch.py
+
+An ingress of 31 actions, API authentication required, and the action at the end of a 31-entry `ACTIONS_AUTH_BY_PASS`.
+No read replicas and no deadline, so the shipped path adds no DB routing or deadline wrappers (see `ActionDispatch.routed`).
+"""
+import json
+import _setup
+
+BY_PASS = [f'x{i}' for i in range(30)] + ['ping']
+_setup.setup(ACTION_AUTH_REQUIRED=True, ACTIONS_AUTH_BY_PASS=BY_PASS, ACTION_METRICS_ENABLED=False, ACTION_ERROR_LOG_ENABLED=False)
+
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from corelib import APIAuth, APIIngressBase, APIHandlerBase, pre_handler  # noqa: E402
+
+N = 100000  # Calls in each timing run.
+
+
+class PingHandler(APIHandlerBase):
+    @pre_handler(readonly=True)
+    def ping(self):
+        self.data = 1
+
+
+class Ingress(APIIngressBase):
+    actions = {'ping': PingHandler, **{f'a{i}': PingHandler for i in range(30)}}
+
+
+def legacy_dispatch(ingress, request, data):
+    """
+    Dispatch steps of `APIIngressBase.post` before the dispatch table: a dict lookup, a handler, `getattr` and
+    a scan of `ACTIONS_AUTH_BY_PASS` for each request.
+    """
+    action = data.get('action')
+    auth_token = data.get('auth_token')
+    if not action or action not in ingress.actions:
+        return None
+    handler = ingress.actions[action](parameters=data, request=request)
+    action_func = getattr(handler, action, None)
+    if action_func is None:
+        return None
+    if action not in BY_PASS:
+        auth = APIAuth()
+        if auth_token:
+            if action_func._is_private:
+                return None
+            auth_result = auth.auth_by_token(auth_token)
+        else:
+            auth_result = auth.auth_by_session(request.user)
+        if not auth_result:
+            return None
+    return handler, action_func
+
+
+def dispatch(ingress, request, data):
+    """
+    `load_action` and `authenticate` as `post` calls them.
+    """
+    loaded, err = ingress.load_action(data.get('action'), data, request)
+    ingress.authenticate(request, [loaded[0]], data.get('auth_token'))
+    return loaded
+
+
+def main():
+    data = {'action': 'ping'}
+    request = RequestFactory().post('/api', data=json.dumps(data), content_type='application/json')
+    request.user = AnonymousUser()
+    ingress = Ingress()
+    ingress.setup(request)
+
+    t = _setup.compare({
+        'before': lambda: legacy_dispatch(ingress, request, dict(data)),
+        'after': lambda: dispatch(ingress, request, dict(data)),
+        'handler': lambda: PingHandler(parameters=dict(data), request=request),
+    }, N // 2)
+    print(f"dispatch per request:     before {t['before']:.2f}us, load_action + authenticate {t['after']:.2f}us")
+    print(f"  handler construction:   {t['handler']:.2f}us, in both of them")
+    print(f"  without the handler:    before {t['before'] - t['handler']:.2f}us, load_action + authenticate {t['after'] - t['handler']:.2f}us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Param validation cost of `dataValidator` per call: validation plans compiled once per handler class
+against validating by `req`/`opt` on each call before them (copied below as `legacy_validate`).
+
+    python benchmarks/bench_validation.py
+
+A handler of 20 fields in `post_fields` (2 required, 18 optional), called with 3 of them, and with all of them.
+"""
+from functools import wraps
+import _setup
+
+_setup.setup()
+
+from corelib import APIHandlerBase, StrType, IntType, BoolType, ChoiceType  # noqa: E402
+from corelib.api_base.decorators import dataValidator  # noqa: E402
+
+N = 10000  # Calls in each timing run.
+
+FIELDS = {f'f{i}': [StrType(max_length=64), IntType(min=0), BoolType(), ChoiceType('a', 'b', 'c')][i % 4] for i in range(20)}
+NAMES = list(FIELDS)
+FEW = {'f0': 'host', 'f1': 2, 'f5': 7}
+ALL = {f'f{i}': ['x', 3, True, 'a'][i % 4] for i in range(20)}
+
+
+def legacy_validate(req=None, opt=None):
+    """
+    `dataValidator` before validation plans: `req`/`opt` are scanned and field types looked up in `post_fields`
+    on each call, and every declared field is tested against the params.
+    """
+    def decorator(func):
+        @wraps(func)
+        def validate(self, *args, **kwargs):
+            required = req if req is not None else []
+            optional = opt if opt is not None else []
+            if self.set_parameters_directly:
+                return func(self, *args, **kwargs)
+            _fd = self.post_fields
+            for field in required:
+                if field not in self.params:
+                    return self.error(f"ERROR: Field '{field}' is required.", return_value=False)
+            self.checked_params = {f: _fd[f].default for f in filter(lambda f: isinstance(_fd[f], BoolType), optional)}
+            for field in filter(lambda f: f in self.params, required + optional):
+                checked_value, err = _fd[field].check(self.params[field])
+                if err is not None:
+                    return self.error(err, return_value=False)
+                self.checked_params[field] = checked_value
+            return func(self, *args, **kwargs)
+        return validate
+    return decorator
+
+
+class Handler(APIHandlerBase):
+    post_fields = FIELDS
+
+    @legacy_validate(req=NAMES[:2], opt=NAMES[2:])
+    def before(self):
+        pass
+
+    @dataValidator(req=NAMES[:2], opt=NAMES[2:])
+    def after(self):
+        pass
+
+
+def main():
+    for label, params in [('3 of 20 fields sent', FEW), ('20 of 20 fields sent', ALL)]:
+        handler = Handler(parameters=dict(params))
+        funcs = {'before': handler.before, 'after': handler.after}
+        for name, func in funcs.items():
+            func()
+            assert handler.result, f"{name}: {handler.error_message}"
+        t = _setup.compare(funcs, N)
+        print(f"{label + ':':22s}before {t['before']:.2f}us, with validation plans {t['after']:.2f}us")
+
+
+if __name__ == '__main__':
+    main()
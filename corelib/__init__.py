@@ -1,16 +1,19 @@
 from .api_auth.api_auth import APIAuth
-from .api_base.api_ingress_base import APIIngressBase
+from .api_base.api_ingress_base import APIIngressBase, AsyncAPIIngressBase
 from .api_base.api_handler_base import APIHandlerBase
 from .api_base.file_upload_handler import FileUploader
 from .api_base.decorators import pre_handler
+from .api_base.metrics import ActionMetricsView
 from .api_base.api_field_types import BoolType, StrType, ChoiceType, ObjectType, ListType, DictType, IntType, DatetimeType, DateType, IPType, ScriptType
 
 __all__ = (
     'APIAuth',
     'APIIngressBase',
+    'AsyncAPIIngressBase',
     'APIHandlerBase',
     'FileUploader',
     'pre_handler',
+    'ActionMetricsView',
     'BoolType',
     'StrType',
     'ChoiceType',
@@ -19,7 +19,7 @@ class AuthTokenHandler(APIHandlerBase, ListDataMixin, AddDataMixin, DeleteDataMi
         'expired_time': IntType(min=0),
     }
 
-    @pre_handler(opt=["search", "page_index", "page_length"], perm="admin")
+    @pre_handler(opt=["search", "page_index", "page_length"], perm="admin", readonly=True)
     def getTokenList(self):
         self.getList(model=AuthToken)
 
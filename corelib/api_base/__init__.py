@@ -4,10 +4,11 @@ from .api_field_types import (
 )
 
 from .api_handler_base import APIHandlerBase
-from .api_ingress_base import APIIngressBase
+from .api_ingress_base import APIIngressBase, AsyncAPIIngressBase
 from .file_upload_handler import FileUploader
 from .decorators import pre_handler
+from .metrics import ActionMetricsView
 
 __all__ = ('BoolType', 'IntType', 'StrType', 'IPType', 'ScriptType', 'ChoiceType', 'DatetimeType',
            'DateType', 'ObjectType', 'ListType', 'DictType',
-           'APIHandlerBase', 'APIIngressBase', 'FileUploader', 'pre_handler')
+           'APIHandlerBase', 'APIIngressBase', 'AsyncAPIIngressBase', 'FileUploader', 'pre_handler', 'ActionMetricsView')
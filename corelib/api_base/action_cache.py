@@ -0,0 +1,134 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Model
+from .defaults import ACTION_CACHE_ALIAS, ACTION_CACHE_KEY_PREFIX
+from collections.abc import Iterator
+from hashlib import blake2b
+import json
+import time
+
+# Handler attributes to be cached, and copied back to handlers on a cache hit.
+CACHED_ATTRS = ('message', 'data', 'data_total_length')
+
+# Labels of models each cached action read last time, learned in process.
+_read_models = {}
+
+# Cache backends local to one process, whose entries and model versions are not seen by other processes.
+_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def get_cache():
+    return caches[ACTION_CACHE_ALIAS]
+
+
+def check_shared_cache(handler_class, feature):
+    """
+    To check cache `ACTION_CACHE_ALIAS` is shared by all processes, required by `feature` of `handler_class`.
+    Checked when an ingress is created. Model versions bumped by a process-local cache are not seen by other
+    worker processes, nor by processes writing data out of requests, which would serve stale results until they expire.
+    """
+    backend = get_cache()
+    if isinstance(backend, _LOCAL_CACHES):
+        raise ImproperlyConfigured(
+            f"{feature} of '{handler_class.__name__}' requires a cache shared by all processes as `ACTION_CACHE_ALIAS`, "
+            f"not '{type(backend).__name__}', like redis, memcached or the database cache.")
+
+
+def _normalize(value):
+    """
+    `default` function for `json.dumps`, to make checked params into a stable string.
+    Model objects resolved by `ObjectType` are keyed by their pk.
+    """
+    if isinstance(value, Model):
+        return f"{value._meta.label}:{value.pk}"
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+def make_cache_key(handler, name):
+    """
+    To make a cache key for calling action `name` on `handler`,
+    over its normalized checked params and the caller's permission group.
+    """
+    params = handler.checked_params if handler.checked_params is not None else handler.params
+    perm_group = getattr(handler.user_perm, 'perm_group', None)
+    raw = json.dumps([params, perm_group], sort_keys=True, default=_normalize, ensure_ascii=False)
+    return f"{ACTION_CACHE_KEY_PREFIX}:{name}:{blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()}"
+
+
+def _version_key(label):
+    return f"{ACTION_CACHE_KEY_PREFIX}:version:{label}"
+
+
+def get_model_versions(labels):
+    """
+    To get current cache versions of models by their labels.
+    A missing version (never written, or evicted) is initialized with a new unique value,
+    so that it never matches a version stored before.
+    """
+    cache = get_cache()
+    keys = {_version_key(label): label for label in labels}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, time.time_ns(), None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def invalidate_model_cache(*models):
+    """
+    To invalidate all cached action results which read data of `models`, by bumping versions of the models.
+    Called by `AddDataMixin`, `ModifyDataMixin` and `DeleteDataMixin` automatically.
+    Call it when writing data in other ways, if an action reading the data is cached.
+    In a DB transaction, it takes effect after the transaction committed.
+    """
+    labels = [model._meta.label for model in models]
+
+    def bump():
+        cache = get_cache()
+        for label in labels:
+            try:
+                cache.incr(_version_key(label))
+            except ValueError:
+                cache.add(_version_key(label), time.time_ns(), None)
+
+    transaction.on_commit(bump)
+
+
+def lookup(handler, name):
+    """
+    To look up the cached result of calling action `name` on `handler`, and copy it into `handler` if hit.
+    Returns a tuple `(hit, key, versions)`. If missed, `versions` are the current versions of models the action
+    read last time, taken before the action runs, and to be passed to `store`.
+    """
+    key = make_cache_key(handler, name)
+    entry = get_cache().get(key)
+    if entry is not None and get_model_versions(entry['versions']) == entry['versions']:
+        for attr in CACHED_ATTRS:
+            setattr(handler, attr, entry[attr])
+        return True, key, None
+    return False, key, get_model_versions(_read_models.get(name, ()))
+
+
+def store(handler, name, key, timeout, versions):
+    """
+    To cache the result of `handler` with the model versions taken by `lookup`.
+    Failed results and streaming data are not cached, nor results shared by a coalesced call (see `coalesce`),
+    whose data may be read before `versions` were taken.
+    Models read are merged into those learned before, since an action may read different models with different params.
+    """
+    _read_models[name] = _read_models.get(name, frozenset()) | handler.read_models
+    if not handler.result or handler.not_modified or handler.coalesced or isinstance(handler.data, Iterator):
+        return
+
+    # Versions taken after the action ran may be newer than the data it read, so the result is not cached
+    # until models it reads are known, which happens after its first run in the process.
+    if handler.read_models - versions.keys():
+        return
+    entry = {attr: getattr(handler, attr, None) for attr in CACHED_ATTRS}
+    entry['versions'] = {label: versions[label] for label in handler.read_models}
+    get_cache().set(key, entry, timeout)
@@ -1,6 +1,13 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.utils import timezone
+from contextlib import contextmanager
+from contextvars import ContextVar
+from .datetime_parsing import get_datetime_parser, get_date_parser
 import socket
 import re
-from datetime import datetime
+
+# Objects resolved in batch for `ObjectType` checks of the running validation, see `resolving`.
+_resolved_objects = ContextVar('resolved_objects', default=None)
 
 
 # To define all supported field_types for operaters.
@@ -21,6 +28,17 @@ class FieldType(object):
         """ Need to be rewrite by sub-classs. """
         return self.failed("ERROR: `check` method is not implemented.", ingore_prefix=True)
 
+    def collect(self, field_value, lookups):
+        """
+        To collect `ObjectType` lookups in `field_value` into `lookups`, before checking, to be resolved in batch.
+        Rewritten by `ObjectType` and container types. See `resolving`.
+        """
+        pass
+
+    def has_lookups(self):
+        """ Whether `collect` may collect any lookups. """
+        return False
+
 
 class BoolType(FieldType):
     """
@@ -78,29 +96,64 @@ class StrType(FieldType):
 class ScriptType(FieldType):
     """
     To check if field value contained dangerous command in each script line.
-    """
+    A command is matched as a whole word: at the start of a line (or after a leading '&&'/'||'), or after whitespace,
+    and followed by whitespace, a trailing '\\', or the end of the line.
 
-    def __init__(self, **kwargs):
+    Initiallizing params:
+        rules: A dict of `{rule_name: command_regex}` to replace `DEFAULT_RULES`.
+        extra_rules: A dict of `{rule_name: command_regex}` to add to the rules.
+    All rules are compiled into one regex, to scan the whole script in one pass.
+    """
+    DEFAULT_RULES = {
+        "alias": r"alias",
+        "rm": r"rm",
+        "mv": r"mv",
+        "mysql": r"mysql",
+        "redis": r"redis-\w+",
+        "mongo": r"mongo-\w+",
+    }
+
+    def __init__(self, rules=None, extra_rules=None, **kwargs):
         super().__init__(**kwargs)
-        _pre, _suf = r'^(.*\s+|\&\&|\|\||)', r'(\s+.*|\\|)$'
-        self.rules = {
-            "alias": re.compile(f"{_pre}alias{_suf}"),
-            "rm": re.compile(f"{_pre}rm{_suf}"),
-            "mv": re.compile(f"{_pre}mv{_suf}"),
-            "mysql": re.compile(f"{_pre}mysql{_suf}"),
-            "redis": re.compile(rf"{_pre}redis-\w+{_suf}"),
-            "mongo": re.compile(rf"{_pre}mongo-\w+{_suf}"),
-        }
+        self.rules = dict(self.DEFAULT_RULES if rules is None else rules)
+        self.rules.update(extra_rules or {})
+        # Rule names may not be valid group names, so groups are named by index.
+        self.rule_names = list(self.rules)
+        # A command is preceded by a whitespace (consumed, which is faster than a lookbehind), or starts a line.
+        commands = '|'.join(f"(?P<r{i}>{regex})" for i, regex in enumerate(self.rules.values()))
+        self.scanner = re.compile(rf"(?:\s|^(?:&&|\|\|)?)(?:{commands})(?=\s|\\?$)", re.MULTILINE) if self.rules else None
 
     def __str__(self):
         return '<ScriptType>'
 
+    def scan(self, script):
+        """
+        Returns a list of `(line_number, rule_name, line)` for every line of `script` matched by any rule, line number starts from 1.
+        """
+        found = []
+        if self.scanner is None:
+            return found
+        pos = line_start = 0
+        line_number = 1
+        while pos <= len(script):
+            m = self.scanner.search(script, pos)
+            if m is None:
+                break
+            start = m.start(m.lastgroup)
+            line_number += script.count('\n', line_start, start)
+            line_start = script.rfind('\n', 0, start) + 1
+            line_end = script.find('\n', m.end())
+            line_end = len(script) if line_end == -1 else line_end
+            found.append((line_number, self.rule_names[int(m.lastgroup[1:])], script[line_start:line_end]))
+            # One report for each line, to go on from the next line.
+            pos = line_end + 1
+        return found
+
     def check(self, field_value):
-        commands = str(field_value).split('\n')
-        for cmd in commands:
-            for k, v in self.rules.items():
-                if v.match(cmd):
-                    return self.failed(f"Dangerous command found: '{cmd}'.")
+        found = self.scan(str(field_value))
+        if found:
+            lines = '; '.join(f"line {n} '{line}'" for n, _, line in found)
+            return self.failed(f"Dangerous command found: {lines}.")
         return field_value, None
 
 
@@ -228,16 +281,20 @@ class DatetimeType(FieldType):
 
     Initiallizing params:
         format: datetime string format passed to function datetime.strptime().
+                Parsed by faster cached parsers with the same result, see `datetime_parsing.get_datetime_parser`.
 
         extra_allowed_values: A list. Contains extra allowed values not match the `format`.
         extra_allowed_trans: A Dict. Using it to translate the extra_allowed_values to target values.
+        aware: If True, return a timezone-aware datetime, naive ones are taken as in django's current time zone.
     """
 
-    def __init__(self, format='%Y-%m-%d %H:%M:%S', extra_allowed_values=None, extra_allowed_trans=None, **kwargs):
+    def __init__(self, format='%Y-%m-%d %H:%M:%S', extra_allowed_values=None, extra_allowed_trans=None, aware=False, **kwargs):
         super().__init__(**kwargs)
         self.format = format
         self.extra_allowed_values = [] if extra_allowed_values is None else extra_allowed_values
         self.extra_allowed_trans = {} if extra_allowed_trans is None else extra_allowed_trans
+        self.aware = aware
+        self.parse = get_datetime_parser(format)
 
     def __str__(self):
         return f"<DatetimeType with format='{self.format}'>"
@@ -249,9 +306,11 @@ class DatetimeType(FieldType):
 
         _field_value = str(field_value)
         try:
-            date_time = datetime.strptime(_field_value, self.format)
+            date_time = self.parse(_field_value)
         except ValueError:
             return self.failed(f"Not matched with datetime format '{self.format}': '{field_value}'.")
+        if self.aware and timezone.is_naive(date_time):
+            date_time = timezone.make_aware(date_time)
         return date_time, None
 
 
@@ -261,11 +320,13 @@ class DateType(FieldType):
 
     Initiallizing params:
         format: date string format passed to function datetime.strptime().
+                Parsed by faster cached parsers with the same result, see `datetime_parsing.get_date_parser`.
     """
 
     def __init__(self, format='%Y-%m-%d', **kwargs):
         super().__init__(**kwargs)
         self.format = format
+        self.parse = get_date_parser(format)
 
     def __str__(self):
         return f"<DateType with format='{self.format}'>"
@@ -273,7 +334,7 @@ class DateType(FieldType):
     def check(self, field_value):
         _field_value = str(field_value)
         try:
-            val = datetime.strptime(_field_value, self.format).date()
+            val = self.parse(_field_value)
         except ValueError:
             return self.failed(f"Not matched with date format '{self.format}': '{field_value}'.")
         return val, None
@@ -288,24 +349,88 @@ class ObjectType(FieldType):
         identified_by: a field name defined in <model>, which usually has a 'unique=True' defined.
         real_query: If True, query object data from by <identified_by>, return a db data object.
                     If False, only check data exists or not, return the origin value.
+        select_related: A list of relation fields, passed to `QuerySet.select_related()`, to join them in the same query.
+        prefetch_related: A list of relation fields, passed to `QuerySet.prefetch_related()`, to load them in one more query.
+        only: A list of fields passed to `QuerySet.only()`. <identified_by> is always loaded.
+              Fields of <select_related> must be listed too, like 'user__username'.
+        defer: A list of fields passed to `QuerySet.defer()`, like large text fields the handler never touches.
+        The four params above only take effect when <real_query> is True, to load what the handler will use with the object,
+        instead of a lazy query for each relation touched later.
     """
-    def __init__(self, model, identified_by='id', real_query=True, **kwargs):
+    def __init__(self, model, identified_by='id', real_query=True, select_related=None, prefetch_related=None, only=None, defer=None,
+                 **kwargs):
         super().__init__(**kwargs)
         self.model = model
         self.identified_by = identified_by
         self.real_query = real_query
+        self.select_related = tuple(select_related or ())
+        self.prefetch_related = tuple(prefetch_related or ())
+        self.only = tuple(only or ())
+        self.defer = tuple(defer or ())
+        if self.only and identified_by not in self.only:
+            self.only += (identified_by, )
+        self.defer = tuple(f for f in self.defer if f != identified_by)
+        # ObjectTypes with the same group are resolved together, see `resolving`.
+        self.lookup_group = (model, identified_by, self.select_related, self.prefetch_related, self.only, self.defer)
 
     def __str__(self):
         return f"<ObjectType for Django Model>"
 
+    def get_queryset(self):
+        queryset = self.model.objects.all()
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        if self.defer:
+            queryset = queryset.defer(*self.defer)
+        return queryset
+
+    def lookup_key(self, field_value):
+        """
+        Returns `field_value` converted to the python value of field <identified_by>, to match values of queried objects.
+        None if it can not be resolved in batch: <identified_by> is not a concrete non-relation field, or the value is illegal.
+        """
+        try:
+            field = self.model._meta.pk if self.identified_by == 'pk' else self.model._meta.get_field(self.identified_by)
+            if not field.concrete or field.is_relation or field_value is None:
+                return None
+            key = field.to_python(field_value)
+            hash(key)
+        except (FieldDoesNotExist, ValidationError, TypeError, ValueError):
+            return None
+        return key
+
+    def has_lookups(self):
+        return True
+
+    def collect(self, field_value, lookups):
+        key = self.lookup_key(field_value)
+        if key is not None:
+            keys, real_query, _ = lookups.get(self.lookup_group, (set(), False, self))
+            keys.add(key)
+            lookups[self.lookup_group] = keys, real_query or self.real_query, self
+
     def check(self, field_value):
-        object_filter = {self.identified_by: field_value}
-        count = self.model.objects.filter(**object_filter).count()
-        if count == 0:
+        matched = None
+        resolved = _resolved_objects.get()
+        if resolved is not None and self.lookup_group in resolved:
+            # A missed key is queried again below, in case the DB matches it in other ways, like case-insensitive collations.
+            matched = resolved[self.lookup_group].get(self.lookup_key(field_value))
+        if matched is None:
+            object_filter = {self.identified_by: field_value}
+            if self.real_query:
+                matched = list(self.get_queryset().filter(**object_filter)[:2])
+            else:
+                matched = list(self.model.objects.filter(**object_filter).values_list('pk', flat=True)[:2])
+
+        if len(matched) == 0:
             return self.failed(f"No data object matched by filter: '{self.identified_by}={field_value}'.")
-        elif count >= 2:
+        elif len(matched) >= 2:
             return self.failed(f"Multi data objects found by filter: '{self.identified_by}={field_value}'.")
-        value = self.model.objects.get(**object_filter) if self.real_query else field_value
+        value = matched[0] if self.real_query else field_value
         return value, None
 
 
@@ -338,6 +463,14 @@ class ListType(FieldType):
             return items, None
         return self.failed(f"Not a list: '{field_value}'.")
 
+    def has_lookups(self):
+        return self.item_type is not None and self.item_type.has_lookups()
+
+    def collect(self, field_value, lookups):
+        if isinstance(field_value, list) and self.item_type is not None:
+            for item in field_value:
+                self.item_type.collect(item, lookups)
+
 
 class DictType(FieldType):
     """
@@ -400,3 +533,62 @@ class DictType(FieldType):
                 _dict[key_check] = val_check
             return _dict, None
         return self.failed(f"Not a dict: '{field_value}'.")
+
+    def has_lookups(self):
+        if isinstance(self.format, dict):
+            return any(fieldtype.has_lookups() for fieldtype in self.format.values())
+        return any(t is not None and t.has_lookups() for t in (self.key_type, self.val_type))
+
+    def collect(self, field_value, lookups):
+        if not isinstance(field_value, dict):
+            return
+        if isinstance(self.format, dict):
+            for key, fieldtype in self.format.items():
+                if key in field_value:
+                    fieldtype.collect(field_value[key], lookups)
+            return
+        for key, val in field_value.items():
+            if self.key_type is not None:
+                self.key_type.collect(key, lookups)
+            if self.val_type is not None:
+                self.val_type.collect(val, lookups)
+
+
+def resolve_objects(lookups):
+    """
+    To resolve `lookups` collected by `FieldType.collect`, with one query for each `ObjectType.lookup_group`,
+    that is for each model and <identified_by> field, if they have the same loading params.
+    Returns `{lookup_group: {key: [matched objects or values]}}`.
+    """
+    resolved = {}
+    for group, (keys, real_query, object_type) in lookups.items():
+        model, identified_by = object_type.model, object_type.identified_by
+        field = model._meta.pk if identified_by == 'pk' else model._meta.get_field(identified_by)
+        lookup = {f'{identified_by}__in': keys}
+        matched = {}
+        if real_query:
+            for obj in object_type.get_queryset().filter(**lookup):
+                matched.setdefault(getattr(obj, field.attname), []).append(obj)
+        else:
+            for value in model.objects.filter(**lookup).values_list(identified_by, flat=True):
+                matched.setdefault(value, []).append(value)
+        resolved[group] = matched
+    return resolved
+
+
+@contextmanager
+def resolving(field_types, values):
+    """
+    To resolve all `ObjectType` lookups in `values` (including nested ones in `ListType`/`DictType`) in batch,
+    for `check` of each field type in `field_types` (in the same order) in this context.
+    So that a list of N object ids costs one query, instead of N.
+    """
+    lookups = {}
+    for field_type, value in zip(field_types, values):
+        field_type.collect(value, lookups)
+    token = _resolved_objects.set(resolve_objects(lookups)) if lookups else None
+    try:
+        yield
+    finally:
+        if token is not None:
+            _resolved_objects.reset(token)
@@ -1,3 +1,14 @@
+from django.db import transaction
+from .conditional import make_version_etag, etag_matches
+from .action_cache import make_cache_key
+from .defaults import ACTION_DEADLINE_FIELD, ACTION_FANOUT_MAX_WORKERS
+from .deadline import run_with_deadline
+from .parallel import run_in_threads
+from .error_log import log_error
+from functools import partial
+import time
+
+
 class APIHandlerBase(object):
     post_fields = {}
 
@@ -7,10 +18,14 @@ class APIHandlerBase(object):
         self.request = request
         self.auth_token = self.params.pop("auth_token", None)
         self.action = self.params.pop("action", "")
+        self.params.pop(ACTION_DEADLINE_FIELD, None)
 
         # 数据校验结果收集，在数据校验装饰器中设定
         self.checked_params = None
 
+        # 已在请求数据加载时校验过的字段值（如增量加载的列表），数据校验装饰器不再重复校验
+        self.prechecked_params = {}
+
         # 将handler作为工具使用，而不是被`apiIngress`调用时，可以设置此参数，绕过数据校验逻辑
         self.set_parameters_directly = set_parameters_directly
 
@@ -26,6 +41,25 @@ class APIHandlerBase(object):
         self.http_status = 200
         self.data = None
 
+        # 是否在一个数据库事务中执行（失败时回滚），由`apiIngress`按`pre_handler(atomic=...)`设置，只对写操作有效
+        self.atomic = False
+
+        # 调用方的截止时间（`time.monotonic()`时间戳），由`apiIngress`设置，None表示没有截止时间
+        self.deadline = None
+
+        # 条件请求：由`setETag`设置，用于对只读action返回304
+        self.etag = None
+        self.not_modified = False
+
+        # 本次处理读取过数据的model label，由ListDataMixin/DetailDataMixin记录，用于`pre_handler(cache=...)`的缓存失效
+        self.read_models = set()
+
+        # 是否直接共享了同一时间相同请求的结果，见`pre_handler(coalesce=...)`
+        self.coalesced = False
+
+        # 各阶段耗时（秒），如数据校验耗时'validate'，用于接口指标统计
+        self.timings = {}
+
     def error(self, error_message, http_status=400, return_value=None, log=True):
         """
         当处理失败时，设置error的便捷方法
@@ -34,18 +68,30 @@ class APIHandlerBase(object):
         self.error_message += error_message
         self.http_status = http_status
         if log:
-            print(self.error_message)
-            err_log = {
-                'action': self.action,
-                'request_params': self.params,
-                'error_message': self.error_message,
-                'result': self.result,
-                'status_code': self.http_status,
-                'data': self.data
-            }
-            print(err_log)
+            # 由后台线程写出JSON日志，见`error_log`
+            log_error(self.error_message, self.http_status, self.action, self.params, self.data)
         return return_value
 
+    def setETag(self, version):
+        """
+        用一个廉价的数据版本（比如数据的最大更新时间、版本号）设置ETag，代替对整个返回数据做hash。
+        ETag中还混入了action、校验后的参数、调用者的权限组与用户，不同的请求不会得到相同的ETag。
+        若与客户端的If-None-Match一致，返回True，此时handler可以直接return，跳过查询与序列化，将返回304。
+        """
+        user = getattr(self.request, 'user', None)
+        self.etag = make_version_etag(version, make_cache_key(self, self.action), getattr(user, 'pk', None))
+        self.not_modified = etag_matches(self.request, self.etag)
+        return self.not_modified
+
+    def remainingTime(self):
+        """
+        距离调用方截止时间的剩余秒数，没有截止时间时返回None。
+        可用作handler中调用外部服务（如k8s、GitLab）的超时时间，DB查询的超时由`apiIngress`自动设置。
+        """
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
     def setResult(self, *handlers, data=None):
         """
         用于此handler有直接调用其他handler时，合并多个handler的处理结果
@@ -53,9 +99,34 @@ class APIHandlerBase(object):
         for handler in handlers:
             self.error_message += handler.error_message
             self.message += handler.message
+            self.read_models.update(handler.read_models)
             if not handler.result:
                 self.result = False
 
         # 跟message，error_message, result不同，data只能设置一次
         if data:
             self.data = data
+
+    def runInParallel(self, *actions, max_workers=None, data=None):
+        """
+        用于聚合类action并发调用多个其他handler，耗时约等于最慢的一个，而不是依次调用的总和。
+        actions: 其他handler上绑定的action方法，如`CronjobReadHandler(parameters={...}, request=self.request).getCronList`；
+        它们在有界线程池中执行（最多max_workers个线程，默认`ACTION_FANOUT_MAX_WORKERS`），每个线程使用自己的数据库连接，结束后关闭；
+        子handler继承此handler的截止时间。全部结束后以`setResult`合并处理结果，返回子handler列表（与actions顺序一致）。
+        注意：子handler的data若是流式返回的生成器，会在之后才读取数据库，不能并发。
+        在数据库事务中调用时（如`pre_handler(atomic=True)`的action、atomic批量请求），其他线程的连接不在此事务中，
+        看不到事务中未提交的写入，写入也不会随事务回滚，此时子handler在当前线程中依次执行，不并发。
+        """
+        handlers = [action.__self__ for action in actions]
+        funcs = []
+        for handler, action in zip(handlers, actions):
+            if handler.deadline is None:
+                handler.deadline = self.deadline
+            funcs.append(partial(run_with_deadline, handler, action))
+        if transaction.get_connection().in_atomic_block:
+            for func in funcs:
+                func()
+        else:
+            run_in_threads(funcs, max_workers or ACTION_FANOUT_MAX_WORKERS)
+        self.setResult(*handlers, data=data)
+        return handlers
@@ -1,85 +1,761 @@
 from django.views.generic import View
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from django.utils.cache import patch_vary_headers, patch_cache_control
+from django.db import transaction
+from django.core.exceptions import RequestDataTooBig
 from corelib import APIAuth
-from .defaults import ACTION_AUTH_REQUIRED, ACTIONS_AUTH_BY_PASS
+from .defaults import (
+    ACTION_AUTH_REQUIRED, ACTIONS_AUTH_BY_PASS, ACTION_BATCH_MAX_SIZE, ACTION_BATCH_MAX_WORKERS, ACTION_JSON_CODEC,
+    ACTION_COMPRESS_RESPONSE, ACTION_CONCURRENCY_REJECT_STATUS, ACTION_MAX_BODY_SIZE, ACTION_WIRE_CODECS, ACTION_ALLOW_GET)
+from .api_field_types import StrType, ScriptType, IPType, DatetimeType, DateType
+from .compression import compress_response
+from .conditional import make_etag, etag_matches, not_modified
+from .json_codec import get_codec, get_wire_codecs, negotiate_codecs
+from .metrics import PhaseTimer, BATCH_ACTION
+from .incremental_json import ijson, load_with_stream_list, check_stream_field, IncrementalLoadError
+from .parallel import run_in_threads, close_connections_after
+from .concurrency import acquire_slot
+from .error_log import log_error
+from .db_routing import infer_readonly, needs_routing, route_action, route_async_action
+from .deadline import get_deadline, run_with_deadline, await_with_deadline
+from .delta_sync import check_sync_cursor
+from .action_cache import check_shared_cache
+from asgiref.sync import async_to_sync, sync_to_async
+from collections import namedtuple
+from collections.abc import Iterator
+from inspect import iscoroutinefunction
+from types import MethodType
+from functools import partial
 
-import json
+
+# Action name marking a batch request, see `APIIngressBase.as_batch`.
+BATCH_REQUEST_ACTION = 'batch'
 
 
 def get_error(msg, status_code=400):
-    print(msg)
+    log_error(msg, status_code)
     return HttpResponse(msg, status=status_code)
 
 
+# A compiled dispatch record of an action. See `APIIngressBase.compile_actions`.
+ActionDispatch = namedtuple('ActionDispatch', [
+    'action',           # action name.
+    'handler_class',    # handler class defined in `actions`.
+    'func',             # The unbound action method. None if not accomplished by the handler class.
+    'is_private',       # Set by `pre_handler(private=...)`.
+    'is_readonly',      # Set by `pre_handler(readonly=...)`, or inferred for methods of read-only data mixins.
+    'is_async',         # True if the action method is an `async def` method.
+    'compress',         # Set by `pre_handler(compress=...)`.
+    'etag',             # Set by `pre_handler(etag=...)`.
+    'max_concurrency',  # Set by `pre_handler(max_concurrency=...)`.
+    'queue_timeout',    # Set by `pre_handler(queue_timeout=...)`.
+    'slot_name',        # Name of concurrency slots of this action.
+    'max_body_size',    # Set by `pre_handler(max_body_size=...)`.
+    'stream_list',      # Set by `pre_handler(stream_list=...)`.
+    'max_age',          # Set by `pre_handler(max_age=...)`.
+    'replica',          # Set by `pre_handler(replica=...)`.
+    'atomic',           # Set by `pre_handler(atomic=...)`.
+    'sync_cursor',      # Set by `pre_handler(sync_cursor=...)`.
+    'routed',           # False if the action runs without `db_routing.route_action`, see `db_routing.needs_routing`.
+    'auth_required',    # False if API authentication is not required for this action.
+    'validation_plan',  # `decorators.ValidationPlan` compiled for the handler class, None if not decorated.
+])
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class APIIngressBase(View):
     actions = {}
 
+    # Codec to load request body and render response data. Can be overridden by sub-classes.
+    codec = get_codec(ACTION_JSON_CODEC)
+
+    # Other codecs negotiated by request's 'Content-Type' and 'Accept', like MessagePack and CBOR.
+    wire_codecs = get_wire_codecs(ACTION_WIRE_CODECS)
+
+    # Bytes size of each chunk sent by streaming responses.
+    stream_chunk_size = 64 * 1024
+
+    # Compiled from `actions`, when a sub-class is created.
+    _dispatch = {}
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.request_codec, self.response_codec = negotiate_codecs(request, self.codec, self.wire_codecs)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.compile_actions()
+
+    @classmethod
+    def compile_actions(cls):
+        """
+        To resolve each entry in `actions` only once into an `ActionDispatch` record, so that dispatching a request
+        costs only a dict lookup.
+        Call it again if `actions` is changed after the class is created.
+        """
+        cls._dispatch = {}
+        for action, handler_class in cls.actions.items():
+            func = getattr(handler_class, action, None)
+            stream_list = getattr(func, '_stream_list', None)
+            if stream_list is not None:
+                check_stream_field(handler_class, stream_list)
+            is_readonly = getattr(func, '_is_readonly', None)
+            if is_readonly is None:
+                is_readonly = infer_readonly(handler_class, action)
+            get_plan = getattr(func, '_validation_plan', None)
+            try:
+                validation_plan = get_plan(handler_class) if get_plan is not None else None
+            except KeyError:
+                validation_plan = None  # Undeclared fields fail when the action is called, as before.
+            if getattr(func, '_cache', None) is not None:
+                check_shared_cache(handler_class, f"Result cache of '{action}'")
+            sync_cursor = getattr(func, '_sync_cursor', None)
+            if sync_cursor is not None:
+                check_sync_cursor(handler_class, sync_cursor, validation_plan)
+            is_async = iscoroutinefunction(func)
+            atomic = getattr(func, '_atomic', None)
+            cls._dispatch[action] = ActionDispatch(
+                action=action,
+                handler_class=handler_class,
+                func=func,
+                is_private=getattr(func, '_is_private', False),
+                is_readonly=is_readonly,
+                is_async=is_async,
+                compress=getattr(func, '_compress', True),
+                etag=getattr(func, '_etag', False),
+                max_concurrency=getattr(func, '_max_concurrency', None),
+                queue_timeout=getattr(func, '_queue_timeout', None),
+                slot_name=f"{handler_class.__module__}.{handler_class.__qualname__}.{action}",
+                max_body_size=getattr(func, '_max_body_size', None),
+                stream_list=stream_list,
+                max_age=getattr(func, '_max_age', None),
+                replica=getattr(func, '_replica', True),
+                atomic=atomic,
+                sync_cursor=sync_cursor,
+                routed=needs_routing(is_readonly, is_async, atomic),
+                auth_required=ACTION_AUTH_REQUIRED and action not in ACTIONS_AUTH_BY_PASS,
+                validation_plan=validation_plan,
+            )
+
     def post(self, request, *args, **kwargs):
-        # To check post data in JSON.
-        data = self.json_load(self.request)
+        timer = PhaseTimer()
+        try:
+            response = self.handle(request, timer)
+        except Exception:
+            timer.fail()
+            raise
+        return timer.finish(response)
+
+    def handle(self, request, timer):
+        """
+        To handle a post request, with time of each phase recorded by `timer`. See `metrics`.
+        """
+        # To check post data in JSON, or query string of a GET request.
+        if request.method == 'GET':
+            data, streamed = self.query_load(request), None
+        else:
+            data, streamed = self.load_body(request, self.action_hint(request))
+        timer.lap('parse')
         if isinstance(data, HttpResponse):
             return data
+
+        batch_data = self.as_batch(data)
+        if batch_data is not None:
+            timer.action = BATCH_ACTION
+            return self.batch(request, batch_data, timer)
+
         action = data.get('action')
         auth_token = data.get('auth_token')
-
-        # validate 'action'
-        if not action:
-            return get_error("ERROR: 'action' field is required.")
-        if action not in self.actions:
-            return get_error(f"ERROR: illegal action: '{action}'")
+        deadline, err = get_deadline(request, data, timer.start)
+        if err is not None:
+            return get_error(err)
 
         # To get action func
-        handler = self.actions[action](parameters=data, request=request)
-        action_func = getattr(handler, action, None)
-        if action_func is None:
-            return get_error("ERROR: method not accomplished by handler.", 500)
+        loaded, err = self.load_action(action, data, request, deadline)
+        timer.lap('parse')
+        if err is not None:
+            return get_error(*err)
+        record, handler, action_func = loaded
+        timer.action = record.action
+        body_error = self.check_loaded_body(request, record, handler, data, streamed)
+        if body_error is not None:
+            return body_error
 
         # authentication
-        if action not in ACTIONS_AUTH_BY_PASS and ACTION_AUTH_REQUIRED:
-            auth = APIAuth()
-            if auth_token:
-                if action_func._is_private:
-                    return get_error(f"ERROR: Private action '{action}' cannot authenticated by auth_token.")
-                auth_result = auth.auth_by_token(auth_token)
-            else:
-                auth_result = auth.auth_by_session(request.user)
-            if not auth_result:
-                return get_error("ERROR: API authentication failed", 401)
+        auth_error = self.authenticate(request, [record], auth_token)
+        timer.lap('auth')
+        if auth_error is not None:
+            return auth_error
 
         # To do the works.
         action_func()
+        timer.lap('handler')
+        timer.split(handler)
 
         # make HttpResponse
+        response = self.make_response(handler, record)
+        if request.method == 'GET':
+            self.patch_cache_headers(response, record)
+        timer.lap('render')
+        return response
+
+    def get(self, request, *args, **kwargs):
+        """
+        Read-only actions can be called by GET, with params in query string. See `query_load`.
+        """
+        if not ACTION_ALLOW_GET:
+            return get_error("GET method is not allowed.", 403)
+        timer = PhaseTimer()
+        try:
+            response = self.handle(request, timer)
+        except Exception:
+            timer.fail()
+            raise
+        return timer.finish(self.patch_cache_headers(response))
+
+    def query_load(self, request):
+        """
+        To load params of a GET request from query string, only for read-only actions (see `pre_handler(readonly=...)`).
+        Values are decoded as JSON if possible, like `page_index=2` or `enabled=true`, otherwise taken as strings.
+        Values of string fields like `StrType` are always taken as strings. Repeated params make a list.
+        Returns params as post data, or an error HttpResponse.
+        """
+        action = request.GET.get('action')
+        record = self._dispatch.get(action) if action else None
+        if record is None or not record.is_readonly:
+            response = get_error(f"ERROR: GET method is not allowed for action '{action}'.", 405)
+            response['Allow'] = 'POST'
+            return response
+
+        post_fields = record.handler_class.post_fields
+        data = {}
+        for key, values in request.GET.lists():
+            if key != 'auth_token' and not isinstance(post_fields.get(key), (StrType, ScriptType, IPType, DatetimeType, DateType)):
+                values = [self.decode_query_value(value) for value in values]
+            data[key] = values[0] if len(values) == 1 else values
+        data['action'] = action
+        return data
+
+    def decode_query_value(self, value):
+        try:
+            return self.codec.loads(value)
+        except Exception:
+            return value
+
+    def patch_cache_headers(self, response, record=None):
+        """
+        To set 'Cache-Control' and 'Vary' headers for a GET response, so that it can be cached by proxies and CDN.
+        Successful responses are cacheable for `pre_handler(max_age=...)` seconds, or must be revalidated (by ETag)
+        if `max_age` is not set. They are private if the action requires authentication. Others are never cached.
+        """
+        if response.has_header('Cache-Control'):
+            return response
+        if record is None or response.status_code not in (200, 304):
+            patch_cache_control(response, no_store=True)
+            return response
+
+        visibility = {'private': True} if record.auth_required else {'public': True}
+        if record.max_age:
+            patch_cache_control(response, max_age=record.max_age, **visibility)
+        else:
+            patch_cache_control(response, no_cache=True, **visibility)
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding', 'Cookie') if record.auth_required else ('Accept', 'Accept-Encoding'))
+        return response
+
+    def load_action(self, action, data, request, deadline=None):
+        """
+        To make a handler for `action` with post data, and get the action function bound on it.
+        `async def` action functions are adapted to be called synchronously.
+        If `deadline` is given, the action function runs with DB statement timeouts, and fails with 504 once exceeded.
+        Read-only actions read from a replica DB if any, see `db_routing`.
+        Returns a tuple: `(record, handler, action_func), None` if succeeded, or `None, (error_message, status_code)`.
+        """
+        # validate 'action'
+        if not action:
+            return None, ("ERROR: 'action' field is required.", 400)
+        record = self._dispatch.get(action) if isinstance(action, str) else None
+        if record is None:
+            return None, (f"ERROR: illegal action: '{action}'", 400)
+        if record.func is None:
+            return None, ("ERROR: method not accomplished by handler.", 500)
+
+        handler = record.handler_class(parameters=data, request=request)
+        handler.deadline = deadline
+        if record.sync_cursor is not None:
+            handler.sync_cursor_field = record.sync_cursor
+        action_func = MethodType(record.func, handler)
+        if record.is_async:
+            action_func = async_to_sync(self.async_action(record, handler))
+        if record.routed:
+            action_func = route_action(record, handler, action_func)
+        if record.max_concurrency:
+            action_func = self.limit_concurrency(record, handler, action_func)
+        if deadline is not None:
+            action_func = partial(run_with_deadline, handler, action_func)
+        return (record, handler, action_func), None
+
+    def async_action(self, record, handler):
+        """
+        To get an `async def` action function, awaited with the deadline of `handler` as timeout.
+        """
+        async def action_func():
+            return await await_with_deadline(handler, MethodType(record.func, handler)())
+        return action_func
+
+    def limit_concurrency(self, record, handler, action_func):
+        """
+        To make `action_func` run only when it gets a free concurrency slot of the action,
+        otherwise the handler fails with `ACTION_CONCURRENCY_REJECT_STATUS` at once. See `concurrency`.
+        """
+        def limited():
+            slot = acquire_slot(record.slot_name, record.max_concurrency, record.queue_timeout)
+            if slot is None:
+                return self.reject(handler, record)
+            try:
+                return action_func()
+            finally:
+                slot.release()
+        return limited
+
+    def reject(self, handler, record):
+        return handler.error(f"ERROR: Too many concurrent requests of action '{record.action}', please retry later.",
+                             http_status=ACTION_CONCURRENCY_REJECT_STATUS)
+
+    def action_hint(self, request):
+        """
+        To get the dispatch record of action hinted by query string `?action=...`, so that body size cap and
+        incremental loading of the action can be applied before reading request body. Returns None if not hinted.
+        """
+        action = request.GET.get('action')
+        return self._dispatch.get(action) if action else None
+
+    def check_body_size(self, request, limit):
+        """
+        To check 'Content-Length' of request against `limit` bytes, before reading request body.
+        Returns None if passed, or an error HttpResponse.
+        """
+        if not limit:
+            return None
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length > limit:
+            return get_error(f"ERROR: Request body too large, max is {limit} bytes.", 413)
+        return None
+
+    def load_body(self, request, hint=None):
+        """
+        To load post data with body size checked first.
+        If `hint` action declares `pre_handler(stream_list=...)` and package 'ijson' is installed, the body is loaded
+        incrementally from request stream, with items of the list field checked one by one. See `incremental_json`.
+        Returns a tuple: `(post_data or error HttpResponse, hint if loaded incrementally else None)`.
+        """
+        limit = hint.max_body_size if hint is not None and hint.max_body_size else ACTION_MAX_BODY_SIZE
+        size_error = self.check_body_size(request, limit)
+        if size_error is not None:
+            return size_error, None
+
+        if hint is None or hint.stream_list is None or ijson is None or 'application/json' not in self.request_codec.media_types:
+            return self.json_load(request), None
+        field_type = hint.handler_class.post_fields[hint.stream_list]
+        try:
+            return load_with_stream_list(request, hint.stream_list, field_type), hint
+        except IncrementalLoadError as e:
+            return get_error(f"ERROR: {str(e)}"), None
+        except Exception:
+            return get_error("ERROR: To load json data failed."), None
+
+    def check_loaded_body(self, request, record, handler, data, streamed=None):
+        """
+        To check body size against cap of the action really called, which may differ from the hinted one.
+        And items checked in incremental loading are passed to the handler, not to be checked again.
+        Returns None if passed, or an error HttpResponse.
+        """
+        size_error = self.check_body_size(request, record.max_body_size or ACTION_MAX_BODY_SIZE)
+        if size_error is not None:
+            return size_error
+        if streamed is not None:
+            if streamed is not record:
+                return get_error("ERROR: Action in query string does not match the one in post data.")
+            if record.stream_list in data:
+                handler.prechecked_params[record.stream_list] = data[record.stream_list]
+        return None
+
+    def authenticate(self, request, actions, auth_token=None):
+        """
+        To authenticate a request only once for all `actions` it carries.
+
+        :actions    A list of `ActionDispatch` records.
+
+        Returns None if passed, or an error HttpResponse.
+        """
+        for record in actions:
+            if record.auth_required:
+                break
+        else:
+            return None
+
+        auth = APIAuth()
+        if auth_token:
+            for record in actions:
+                if record.is_private:
+                    return get_error(f"ERROR: Private action '{record.action}' cannot authenticated by auth_token.")
+            auth_result = auth.auth_by_token(auth_token)
+        else:
+            auth_result = auth.auth_by_session(request.user)
+        if not auth_result:
+            return get_error("ERROR: API authentication failed", 401)
+        return None
+
+    def make_response(self, handler, record):
+        # The handler found data not modified by `setETag`, no need to render.
+        if handler.result and handler.not_modified:
+            return not_modified(handler.etag)
+        if handler.result and isinstance(handler.data, Iterator) and self.response_codec.streamable:
+            return self.render_stream(self.make_response_data(handler, with_data=False), handler.data, status=handler.http_status)
+
+        etag = None
+        if handler.result:
+            etag = handler.etag if handler.etag is not None else record.etag
+        response = self.render(self.make_response_data(handler), status=handler.http_status, compress=record.compress, etag=etag)
+        if handler.http_status in (429, 503):
+            response['Retry-After'] = '1'
+        return response
+
+    def render(self, response_data, status=200, compress=True, etag=None):
+        """
+        To render response data into a HttpResponse.
+        Compressed by negotiation with request's 'Accept-Encoding' if `compress` is True and `ACTION_COMPRESS_RESPONSE` is on.
+
+        :etag   An ETag string, or True to compute one over rendered content.
+                '304 Not Modified' is returned if it matches request's 'If-None-Match'.
+        """
+        content = self.response_codec.dumps(response_data)
+        if etag is True:
+            etag = make_etag(content)
+        if etag and etag_matches(self.request, etag):
+            return not_modified(etag)
+
+        response = HttpResponse(content, content_type=self.response_codec.content_type, status=status)
+        if etag:
+            response['ETag'] = etag
+        if self.wire_codecs:
+            patch_vary_headers(response, ('Accept',))
+        if compress and ACTION_COMPRESS_RESPONSE:
+            response = compress_response(self.request, response)
+        return response
+
+    def render_stream(self, response_data, rows, status=200):
+        """
+        To render `response_data` with an iterator `rows` as its 'data' list in a StreamingHttpResponse.
+        Rows are encoded one by one when they are produced, and sent in chunks of about `stream_chunk_size` bytes.
+        So the whole list and its full JSON string are never held in memory.
+        Note: errors raised in `rows` can no longer change the response status, the response will be truncated.
+        """
+        return StreamingHttpResponse(self.stream_chunks(response_data, rows), content_type=self.response_codec.content_type, status=status)
+
+    def stream_chunks(self, response_data, rows):
+        """
+        Only for JSON codecs. Responses of codecs not `streamable` are rendered with rows turned into a list.
+        """
+        codec = self.response_codec
+        chunk, sep = codec.dumps(response_data)[:-1] + b',"data":[', b''
+        for row in rows:
+            chunk += sep + codec.dumps(row)
+            sep = b','
+            if len(chunk) >= self.stream_chunk_size:
+                yield chunk
+                chunk = b''
+        yield chunk + b']}'
+
+    def make_response_data(self, handler, with_data=True):
+        """
+        To make response data dict from handler results.
+        An iterator `handler.data` will be turned into a list, unless `with_data` is False to leave it to `render_stream`.
+        """
         if handler.result:
             response_data = {"result": "SUCCESS", "message": str(handler.message)}
-            if getattr(handler, 'data', None) is not None:
-                response_data['data'] = handler.data
+            if with_data and getattr(handler, 'data', None) is not None:
+                response_data['data'] = list(handler.data) if isinstance(handler.data, Iterator) else handler.data
             if getattr(handler, 'data_total_length', None) is not None:
                 response_data['data_total_length'] = handler.data_total_length
         else:
             response_data = {"result": "FAILED", "message": str(handler.error_message)}
+        return response_data
 
-        return HttpResponse(json.dumps(response_data), content_type='application/json', status=handler.http_status)
+    def as_batch(self, data):
+        """
+        Returns post data of a batch request as a dict, or None if not a batch request.
+        A batch request is marked explicitly: a JSON array of actions, or a dict with `"action": "batch"`
+        (unless 'batch' is an action of this ingress). A 'batch' field of a normal action is just a param.
+        """
+        if isinstance(data, list):
+            return {'batch': data}
+        if data.get('action') == BATCH_REQUEST_ACTION and BATCH_REQUEST_ACTION not in self._dispatch:
+            return data
+        return None
 
-    def get(self, request, *args, **kwargs):
-        return get_error("GET method is not allowed.", 403)
+    def batch(self, request, data, timer=None):
+        """
+        To run a batch of actions carried by one request, with only one authentication.
+
+        Post data:
+            action      'batch', or post data is the list of `batch` directly. See `as_batch`.
+            batch       A list of dict, each one is a normal action post data like `{"action": ..., ...params}`.
+            auth_token  Optional. Works for all actions in the batch.
+            atomic      Optional. If True, all actions run in order in one DB transaction, which will be rolled back
+                        when any action failed. (All or nothing.)
+
+        Actions run in order. Adjacent read-only actions (see `pre_handler`) run in parallel when `atomic` is not set.
+        Each action gets its own result with `action` and `status_code` in response `data`.
+        """
+        timer = PhaseTimer() if timer is None else timer
+        items = data.get('batch')
+        auth_token = data.get('auth_token')
+        atomic = bool(data.get('atomic', False))
+        deadline, err = get_deadline(request, data, timer.start)
+        if err is not None:
+            return get_error(err)
+        if not isinstance(items, list) or not items:
+            return get_error("ERROR: 'batch' field must be a non-empty list.")
+        if len(items) > ACTION_BATCH_MAX_SIZE:
+            return get_error(f"ERROR: Too many actions in one batch, max is {ACTION_BATCH_MAX_SIZE}.")
+
+        # To load all actions before running any of them. One illegal item fails the whole batch.
+        loaded = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                return get_error(f"ERROR: Batch item {index} is not a dict.")
+            params = dict(item)
+            params.pop('auth_token', None)
+            if auth_token:
+                params['auth_token'] = auth_token
+            action = params.get('action')
+            _loaded, err = self.load_action(action, params, request, deadline)
+            if err is not None:
+                return get_error(f"Batch item {index}: {err[0]}", err[1])
+            body_error = self.check_body_size(request, _loaded[0].max_body_size or ACTION_MAX_BODY_SIZE)
+            if body_error is not None:
+                return body_error
+            loaded.append(_loaded)
+        timer.lap('parse')
+
+        # authentication, only once.
+        auth_error = self.authenticate(request, [record for record, _, _ in loaded], auth_token)
+        timer.lap('auth')
+        if auth_error is not None:
+            return auth_error
+
+        # To do the works.
+        message = ''
+        done = len(loaded)
+        if atomic:
+            failed = self.run_atomic(loaded)
+            if failed is not None:
+                done = failed + 1
+                message = f"ERROR: Action '{loaded[failed][0].action}' failed, all actions in this batch rolled back."
+        else:
+            self.run_in_order(loaded)
+        timer.lap('handler')
+
+        results = []
+        for index, (record, handler, _) in enumerate(loaded):
+            if index < done:
+                result = {'action': record.action, 'status_code': handler.http_status, **self.make_response_data(handler)}
+            else:
+                result = {'action': record.action, 'status_code': 424, 'result': 'FAILED', 'message': 'ERROR: Skipped for a previous failed action.'}
+            results.append(result)
+
+        all_succeeded = not message and all(result['result'] == 'SUCCESS' for result in results)
+        response_data = {'result': 'SUCCESS' if all_succeeded else 'FAILED', 'message': message, 'data': results}
+        response = self.render(response_data, compress=all(record.compress for record, _, _ in loaded))
+        timer.lap('render')
+        return response
+
+    def run_in_order(self, loaded):
+        """
+        To run actions in order. Adjacent read-only actions are grouped to run in parallel.
+        """
+        group = []
+        for record, handler, action_func in loaded:
+            if record.is_readonly:
+                group.append(action_func)
+                continue
+            run_in_threads(group, max_workers=ACTION_BATCH_MAX_WORKERS)
+            group = []
+            action_func()
+        run_in_threads(group, max_workers=ACTION_BATCH_MAX_WORKERS)
+
+    def run_atomic(self, loaded):
+        """
+        To run actions in order in one DB transaction, and stop at the first failed one.
+        Returns index of the failed action, or None if all succeeded.
+        """
+        with transaction.atomic():
+            for index, (record, handler, action_func) in enumerate(loaded):
+                action_func()
+                if not handler.result:
+                    transaction.set_rollback(True)
+                    return index
+        return None
 
     def json_load(self, request, decode_type='utf-8'):
         """
         To load json data from http request.body.
         If Not a JSON data, return ERROR.
-        If data not a dict, return ERROR.
+        If data not a dict (or a list for batch request), return ERROR.
+        UTF-8 body is passed to the codec as bytes directly, without a decoded copy.
         """
 
         try:
-            post_data = json.loads(request.body.decode(decode_type))
+            body = request.body if decode_type == 'utf-8' else request.body.decode(decode_type)
+            post_data = self.request_codec.loads(body)
+        except RequestDataTooBig:
+            return get_error("ERROR: Request body too large, exceeds `DATA_UPLOAD_MAX_MEMORY_SIZE` setting.", 413)
         except Exception:
             return get_error("ERROR: To load json data failed.")
 
-        if isinstance(post_data, dict):
+        if isinstance(post_data, (dict, list)):
             return post_data
         else:
             return get_error("ERROR: Post data is not a dict.", 400)
+
+
+class AsyncAPIIngressBase(APIIngressBase):
+    """
+    The async version of `APIIngressBase`, to run under ASGI (uvicorn, daphne, etc.).
+
+    `async def` action methods are awaited directly in the event loop, so a process can multiplex many in-flight
+    I/O-bound actions, like calling k8s, GitLab or salt-api.
+    Normal action methods still work, they are offloaded to a worker thread with its own DB connections.
+
+    Usage is the same as `APIIngressBase`:
+
+        class APIIngress(AsyncAPIIngressBase):
+            actions = {...}
+    """
+
+    async def post(self, request, *args, **kwargs):
+        timer = PhaseTimer()
+        try:
+            response = await self.async_handle(request, timer)
+        except Exception:
+            timer.fail()
+            raise
+        return timer.finish(response)
+
+    async def async_handle(self, request, timer):
+        # To check post data in JSON, or query string of a GET request.
+        # Items of a list loaded incrementally may be checked by DB queries.
+        hint = self.action_hint(request)
+        if request.method == 'GET':
+            data, streamed = self.query_load(request), None
+        elif hint is not None and hint.stream_list is not None:
+            data, streamed = await sync_to_async(self.load_body)(request, hint)
+        else:
+            data, streamed = self.load_body(request, hint)
+        timer.lap('parse')
+        if isinstance(data, HttpResponse):
+            return data
+
+        # Batch requests run in a worker thread, `async def` actions in it are still supported.
+        batch_data = self.as_batch(data)
+        if batch_data is not None:
+            timer.action = BATCH_ACTION
+            return await sync_to_async(close_connections_after(lambda: self.batch(request, batch_data, timer)), thread_sensitive=False)()
+
+        action = data.get('action')
+        auth_token = data.get('auth_token')
+        deadline, err = get_deadline(request, data, timer.start)
+        if err is not None:
+            return get_error(err)
+
+        # To get action func
+        loaded, err = self.load_action(action, data, request, deadline)
+        timer.lap('parse')
+        if err is not None:
+            return get_error(*err)
+        record, handler, action_func = loaded
+        timer.action = record.action
+        body_error = self.check_loaded_body(request, record, handler, data, streamed)
+        if body_error is not None:
+            return body_error
+
+        # authentication
+        auth_error = await sync_to_async(self.authenticate)(request, [record], auth_token)
+        timer.lap('auth')
+        if auth_error is not None:
+            return auth_error
+
+        # To do the works.
+        if record.is_async:
+            await self.run_async_action(record, handler)
+        else:
+            await sync_to_async(close_connections_after(action_func), thread_sensitive=False)()
+        timer.lap('handler')
+        timer.split(handler)
+
+        # make HttpResponse
+        await self.materialize_rows(handler)
+        response = self.make_response(handler, record)
+        if request.method == 'GET':
+            self.patch_cache_headers(response, record)
+        timer.lap('render')
+        return response
+
+    async def materialize_rows(self, handler):
+        """
+        Streamed rows (see `ListDataMixin.getList(stream=True)`) are read from DB while rendered. A codec not `streamable`
+        renders them as a list, which is read here in a worker thread like `render_stream` does, since DB queries are not allowed
+        in the event loop.
+        """
+        if handler.result and isinstance(handler.data, Iterator) and not self.response_codec.streamable:
+            handler.data = await sync_to_async(list)(handler.data)
+
+    async def get(self, request, *args, **kwargs):
+        if not ACTION_ALLOW_GET:
+            return get_error("GET method is not allowed.", 403)
+        timer = PhaseTimer()
+        try:
+            response = await self.async_handle(request, timer)
+        except Exception:
+            timer.fail()
+            raise
+        return timer.finish(self.patch_cache_headers(response))
+
+    async def run_async_action(self, record, handler):
+        """
+        To await an `async def` action in the event loop, with its concurrency limit, deadline and DB routing.
+        """
+        slot = None
+        if record.max_concurrency:
+            slot = await sync_to_async(acquire_slot, thread_sensitive=False)(record.slot_name, record.max_concurrency, record.queue_timeout)
+            if slot is None:
+                return self.reject(handler, record)
+        try:
+            action_func = self.async_action(record, handler)
+            if record.routed:
+                action_func = route_async_action(record, handler, action_func)
+            await action_func()
+        finally:
+            if slot is not None:
+                slot.release()
+
+    def render_stream(self, response_data, rows, status=200):
+        """
+        Rows are produced by DB queries, so chunks are generated in a worker thread, and sent by an async iterator.
+        """
+        chunks = self.stream_chunks(response_data, rows)
+        next_chunk = sync_to_async(next)
+
+        async def stream():
+            while True:
+                chunk = await next_chunk(chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+
+        return StreamingHttpResponse(stream(), content_type=self.response_codec.content_type, status=status)
@@ -0,0 +1,65 @@
+from .defaults import ACTION_COALESCE_TIMEOUT
+from collections.abc import Iterator
+import threading
+
+# Handler attributes shared by the leading request with the waiting ones.
+# 'read_models' too, for `action_cache` to learn models the action reads from any request.
+SHARED_ATTRS = ('result', 'message', 'error_message', 'http_status', 'data', 'data_total_length', 'etag', 'read_models')
+
+# In-flight actions of this process, `{key: Flight}`.
+_flights = {}
+_lock = threading.Lock()
+
+
+class Flight(object):
+    """
+    One running action, which identical requests arriving meanwhile can wait for.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.shared = None  # Handler attributes to share, None if nothing to share.
+
+    def wait(self, timeout=None):
+        """
+        Returns shared attributes, or None if timed out or the leading request has nothing to share.
+        """
+        timeout = ACTION_COALESCE_TIMEOUT if timeout is None else timeout
+        if not self.done.wait(timeout):
+            return None
+        return self.shared
+
+
+def join(key):
+    """
+    To join the flight of `key`. Returns a tuple `(flight, is_leader)`.
+    The leader must run the action and call `land` at last, others can `wait` for it.
+    """
+    with _lock:
+        flight = _flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = _flights[key] = Flight()
+        return flight, True
+
+
+def land(key, flight, handler=None):
+    """
+    To end the flight of `key`, and share results of `handler` with requests waiting for it.
+    Streaming data and '304 Not Modified' results are not shared, since they belong to one request only.
+    If `handler` is None (the leader raised an error), waiting requests will run the action by themselves.
+    """
+    if handler is not None and not handler.not_modified and not isinstance(handler.data, Iterator):
+        flight.shared = {attr: getattr(handler, attr, None) for attr in SHARED_ATTRS}
+    with _lock:
+        if _flights.get(key) is flight:
+            del _flights[key]
+    flight.done.set()
+
+
+def copy_to(handler, shared):
+    """
+    To copy shared attributes into a waiting `handler`, and mark it as `coalesced`.
+    """
+    for attr, value in shared.items():
+        setattr(handler, attr, set(value) if attr == 'read_models' else value)
+    handler.coalesced = True
@@ -0,0 +1,102 @@
+from django.utils.cache import patch_vary_headers
+from .defaults import ACTION_COMPRESS_ENCODINGS, ACTION_COMPRESS_MIN_SIZE
+
+import gzip
+
+# Optional compressors.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _gzip(data):
+    return gzip.compress(data, compresslevel=6)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=5)
+
+
+def _zstd(data):
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+# Only compressors whose package is installed are available.
+COMPRESSORS = {'gzip': _gzip}
+if brotli is not None:
+    COMPRESSORS['br'] = _brotli
+if zstandard is not None:
+    COMPRESSORS['zstd'] = _zstd
+
+
+def parse_accept_encoding(header):
+    """
+    To parse an 'Accept-Encoding' header into a dict: `{coding: qvalue}`.
+    """
+    accepted = {}
+    for item in header.split(','):
+        coding, *params = item.strip().split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            k, _, v = param.strip().partition('=')
+            if k.strip() == 'q':
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header, encodings=None):
+    """
+    To choose the best available encoding accepted by client.
+    Client's qvalue goes first, then the order of `encodings` (server preference) breaks ties.
+    Returns None if nothing acceptable.
+    """
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_q = None, 0.0
+    for coding in (ACTION_COMPRESS_ENCODINGS if encodings is None else encodings):
+        if coding not in COMPRESSORS:
+            continue
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress_response(request, response, min_size=None):
+    """
+    To compress content of a (non-streaming) HttpResponse, negotiated by request's 'Accept-Encoding'.
+    Responses smaller than `min_size` bytes are left as they are.
+    """
+    min_size = ACTION_COMPRESS_MIN_SIZE if min_size is None else min_size
+    if response.streaming or response.has_header('Content-Encoding') or len(response.content) < min_size:
+        return response
+
+    patch_vary_headers(response, ('Accept-Encoding',))
+    encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if encoding is None:
+        return response
+
+    compressed = COMPRESSORS[encoding](response.content)
+    if len(compressed) >= len(response.content):
+        return response
+    response.content = compressed
+    response['Content-Length'] = str(len(compressed))
+    response['Content-Encoding'] = encoding
+
+    # A strong ETag is made over uncompressed content, it is weak for compressed content.
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    return response
@@ -0,0 +1,90 @@
+from .defaults import ACTION_CONCURRENCY_LOCK_DIR
+import os
+import random
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Not a POSIX system.
+    fcntl = None
+
+
+class FileSlot(object):
+    """
+    One acquired slot, which is an exclusive `flock` on a slot file.
+    The lock is released by kernel too if the process dies, so slots never leak.
+    """
+    def __init__(self, fd):
+        self.fd = fd
+
+    def release(self):
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self.fd)
+
+
+class ThreadSlot(object):
+    """
+    Fallback slot for systems without `fcntl`, limits concurrency only inside this process.
+    """
+    def __init__(self, semaphore):
+        self.semaphore = semaphore
+
+    def release(self):
+        self.semaphore.release()
+
+
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+
+
+def _try_file_slots(name, limit):
+    os.makedirs(ACTION_CONCURRENCY_LOCK_DIR, exist_ok=True)
+    # To start from a random slot, so that requests do not always contend for the first ones.
+    start = random.randrange(limit)
+    for i in range(limit):
+        path = os.path.join(ACTION_CONCURRENCY_LOCK_DIR, f"{name}.{(start + i) % limit}.lock")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            continue
+        except Exception:
+            os.close(fd)
+            raise
+        return FileSlot(fd)
+    return None
+
+
+def _try_thread_slot(name, limit):
+    with _semaphores_lock:
+        semaphore = _semaphores.get((name, limit))
+        if semaphore is None:
+            semaphore = _semaphores[(name, limit)] = threading.BoundedSemaphore(limit)
+    return ThreadSlot(semaphore) if semaphore.acquire(blocking=False) else None
+
+
+def acquire_slot(name, limit, timeout=None):
+    """
+    To acquire one of `limit` execution slots of `name`, shared by all processes on this host
+    through lock files in `ACTION_CONCURRENCY_LOCK_DIR`.
+
+    :timeout    Seconds to wait for a free slot. None or 0 means not to wait at all.
+
+    Returns a slot object with a `release` method, or None if no slot is free in time.
+    """
+    try_slot = _try_file_slots if fcntl is not None else _try_thread_slot
+    deadline = time.monotonic() + (timeout or 0)
+    delay = 0.005
+    while True:
+        slot = try_slot(name, limit)
+        if slot is not None:
+            return slot
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.1)
@@ -0,0 +1,39 @@
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from hashlib import blake2b
+import json
+
+
+def make_etag(content):
+    """
+    To make a strong ETag over rendered response content (bytes).
+    """
+    return quote_etag(blake2b(content, digest_size=16).hexdigest())
+
+
+def make_version_etag(version, *scope):
+    """
+    To make a strong ETag from a cheap version key, like a max 'update_time' or a version column of the data,
+    and `scope` of the data, like action, params and user, so that different data never get the same ETag.
+    """
+    return make_etag(json.dumps([str(version), *scope], default=str).encode('utf-8'))
+
+
+def etag_matches(request, etag):
+    """
+    To check request's 'If-None-Match' header against `etag`, with weak comparison.
+    """
+    header = request.META.get('HTTP_IF_NONE_MATCH') if request is not None else None
+    if not header:
+        return False
+    etags = parse_etags(header)
+    if '*' in etags:
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    return any((e[2:] if e.startswith('W/') else e) == opaque for e in etags)
+
+
+def not_modified(etag):
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    return response
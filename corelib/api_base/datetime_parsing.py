@@ -0,0 +1,113 @@
+from datetime import datetime, date
+from functools import lru_cache
+import re
+
+# Sub-patterns of directives, the same as `datetime.strptime` uses (see stdlib `_strptime.TimeRE`).
+_DIRECTIVES = {
+    'Y': r"(?P<Y>\d\d\d\d)",
+    'm': r"(?P<m>1[0-2]|0[1-9]|[1-9])",
+    'd': r"(?P<d>3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])",
+    'H': r"(?P<H>2[0-3]|[0-1]\d|\d)",
+    'M': r"(?P<M>[0-5]\d|\d)",
+    'S': r"(?P<S>6[0-1]|[0-5]\d|\d)",
+    'f': r"(?P<f>[0-9]{1,6})",
+}
+_FORMAT_TOKENS = re.compile(r"%(.)|(\s+)|([^%\s]+)|(%)", re.DOTALL)
+
+# ISO formats `fromisoformat` can parse, with their lengths and separators, see `_iso_parser`.
+_ISO_FORMATS = {
+    '%Y-%m-%d %H:%M:%S': (19, ' '),
+    '%Y-%m-%dT%H:%M:%S': (19, 'T'),
+    '%Y-%m-%d %H:%M': (16, ' '),
+    '%Y-%m-%dT%H:%M': (16, 'T'),
+    '%Y-%m-%d': (10, None),
+}
+
+
+def _regex_parser(format):
+    """
+    Returns a parser of `format` with a compiled regex, if it only has directives in `_DIRECTIVES`, otherwise None.
+    It accepts and rejects the same values as `datetime.strptime`, without its per-call overhead.
+    """
+    pattern, names = [], set()
+    for directive, spaces, literal, bad in _FORMAT_TOKENS.findall(format):
+        if bad:
+            return None
+        elif directive:
+            if directive == '%':
+                pattern.append('%')
+            elif directive in _DIRECTIVES and directive not in names:
+                pattern.append(_DIRECTIVES[directive])
+                names.add(directive)
+            else:
+                return None
+        elif spaces:
+            pattern.append(r'\s+')
+        else:
+            pattern.append(re.escape(literal))
+    regex = re.compile(''.join(pattern), re.IGNORECASE)
+
+    def parse(value):
+        # Not `fullmatch`, to reject values just like `strptime` does.
+        m = regex.match(value)
+        if m is None:
+            raise ValueError(f"time data {value!r} does not match format {format!r}")
+        if m.end() != len(value):
+            raise ValueError(f"unconverted data remains: {value[m.end():]}")
+        g = m.groupdict()
+        fraction = g.get('f')
+        return datetime(
+            int(g['Y']) if 'Y' in g else 1900, int(g['m']) if 'm' in g else 1, int(g['d']) if 'd' in g else 1,
+            int(g.get('H') or 0), int(g.get('M') or 0), int(g.get('S') or 0), int(fraction.ljust(6, '0')) if fraction else 0)
+    return parse
+
+
+def _iso_parser(format, fallback):
+    """
+    Returns a parser of ISO `format` with `datetime.fromisoformat`, which is much faster.
+    `fromisoformat` accepts more forms than `format`, so it is only used for values of the exact length and separators,
+    others go to `fallback`, so do values it rejects, to raise the same errors.
+    """
+    length, sep = _ISO_FORMATS[format]
+
+    def parse(value):
+        if (len(value) == length and value[4] == '-' and value[7] == '-'
+                and (sep is None or (value[10] == sep and value[13] == ':' and value[11:13] < '24' and (length == 16 or value[16] == ':')))):
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                pass
+        return fallback(value)
+    return parse
+
+
+@lru_cache(maxsize=128)
+def get_datetime_parser(format):
+    """
+    Returns a function to parse a string to a naive datetime by `format`, the same as `datetime.strptime(value, format)`,
+    but faster for ISO formats and formats of directives '%Y %m %d %H %M %S %f'. Raises `ValueError` if not matched.
+    """
+    regex_parser = _regex_parser(format)
+    if regex_parser is None:
+        return lambda value: datetime.strptime(value, format)
+    if format in _ISO_FORMATS:
+        return _iso_parser(format, regex_parser)
+    return regex_parser
+
+
+@lru_cache(maxsize=128)
+def get_date_parser(format):
+    """
+    Returns a function to parse a string to a date by `format`, the same as `datetime.strptime(value, format).date()`.
+    """
+    parse_datetime = get_datetime_parser(format)
+    if format == '%Y-%m-%d':
+        def parse(value):
+            if len(value) == 10 and value[4] == '-' and value[7] == '-':
+                try:
+                    return date.fromisoformat(value)
+                except ValueError:
+                    pass
+            return parse_datetime(value).date()
+        return parse
+    return lambda value: parse_datetime(value).date()
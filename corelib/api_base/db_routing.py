@@ -0,0 +1,129 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+from corelib.api_serializing_mixins import ListDataMixin, DetailDataMixin
+from corelib.api_serializing_mixins.get_data_common import BaseSerializingMixin
+from .defaults import ACTION_READ_REPLICAS, ACTION_ATOMIC_WRITES
+from contextlib import contextmanager
+from contextvars import ContextVar
+import random
+
+# DB alias for reads of the running action, None means to let django decide (the default DB).
+_read_db = ContextVar('action_read_db', default=None)
+
+# Data mixins whose methods are read-only.
+READONLY_MIXINS = {ListDataMixin, DetailDataMixin, BaseSerializingMixin}
+
+
+class ActionDBRouter(object):
+    """
+    A django DB router, to send reads of read-only actions to a replica DB. To enable it in settings:
+
+        DATABASE_ROUTERS = ['corelib.api_base.db_routing.ActionDBRouter']
+        ACTION_READ_REPLICAS = ['replica']  # Aliases in `DATABASES`.
+
+    Reads of other actions, and all writes, go to the default DB (the primary).
+    """
+    def db_for_read(self, model, **hints):
+        return _read_db.get()
+
+    def db_for_write(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in ACTION_READ_REPLICAS:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *ACTION_READ_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db in ACTION_READ_REPLICAS else None
+
+
+@contextmanager
+def read_from(alias):
+    """
+    To route reads in this context (the thread, or the coroutine) to DB `alias`.
+    """
+    token = _read_db.set(alias)
+    try:
+        yield
+    finally:
+        _read_db.reset(token)
+
+
+def pick_replica():
+    """
+    To pick a replica DB alias at random, or None if no replica.
+    """
+    return random.choice(ACTION_READ_REPLICAS) if ACTION_READ_REPLICAS else None
+
+
+def infer_readonly(handler_class, action):
+    """
+    An action not declared by `pre_handler`, which is a method provided by `ListDataMixin`/`DetailDataMixin` themselves,
+    is inferred read-only. Actions defined by handler classes are not, whatever data mixins they use,
+    since they may write data in other ways. Declare them by `pre_handler(readonly=True)`.
+    """
+    for base in handler_class.__mro__:
+        if action in vars(base):
+            return base in READONLY_MIXINS
+    return False
+
+
+def action_db(record):
+    """
+    DB alias for reads of an action: a replica for read-only actions if `ACTION_READ_REPLICAS` is set, otherwise the primary.
+    Called when the action runs. In a transaction of the primary, like a batch run by `APIIngressBase.run_atomic`,
+    reads stay on the primary, to see writes of the transaction and not to mix data of different DBs in it.
+    """
+    if record.is_readonly and record.replica and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return pick_replica()
+    return DEFAULT_DB_ALIAS
+
+
+def needs_routing(is_readonly, is_async, atomic):
+    """
+    Whether an action has to run by `route_action`: always if `ACTION_READ_REPLICAS` is set, otherwise only a write action
+    run in a transaction (see `set_atomic`), since all reads go to the primary anyway. Decided when the ingress is created.
+    """
+    if ACTION_READ_REPLICAS:
+        return True
+    return not is_readonly and not is_async and (ACTION_ATOMIC_WRITES if atomic is None else bool(atomic))
+
+
+def set_atomic(record, handler):
+    """
+    To set `handler.atomic` of a write action, by `pre_handler(atomic=...)` or `ACTION_ATOMIC_WRITES`.
+    `async def` actions never run in a transaction: their DB queries run in different threads.
+    """
+    if not record.is_readonly and not record.is_async:
+        handler.atomic = ACTION_ATOMIC_WRITES if record.atomic is None else record.atomic
+
+
+def route_action(record, handler, action_func):
+    """
+    To make `action_func` run:
+        read-only actions   Reading from a replica DB, without transaction. From the primary in a transaction, see `action_db`.
+        other actions       Pinned to the primary DB, and in one transaction if `pre_handler(atomic=...)` or `ACTION_ATOMIC_WRITES`.
+                            See `decorators.transactional`.
+    """
+    set_atomic(record, handler)
+
+    def routed():
+        with read_from(action_db(record)):
+            return action_func()
+    return routed
+
+
+def route_async_action(record, handler, action_func):
+    """
+    The same as `route_action`, for an `async def` `action_func` awaited in the event loop.
+    """
+    set_atomic(record, handler)
+
+    async def routed():
+        with read_from(action_db(record)):
+            return await action_func()
+    return routed
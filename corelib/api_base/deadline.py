@@ -0,0 +1,139 @@
+from django.db import connections, DatabaseError
+from .defaults import ACTION_DEADLINE_HEADER, ACTION_DEADLINE_FIELD, ACTION_DEADLINE_DEFAULT_MS, ACTION_DEADLINE_MAX_MS
+from contextlib import ExitStack, contextmanager
+import asyncio
+import time
+
+DEADLINE_EXCEEDED_MESSAGE = "ERROR: Deadline exceeded, the action was aborted."
+
+
+class DeadlineExceeded(DatabaseError):
+    """
+    Raised before executing a DB query when the deadline has been exceeded.
+    """
+    pass
+
+
+def get_deadline(request, data, start):
+    """
+    To get the deadline of a request, as a `time.monotonic()` timestamp, or None if no deadline.
+    The budget in milliseconds is taken from header `ACTION_DEADLINE_HEADER`, or field `ACTION_DEADLINE_FIELD` of post data,
+    counting from `start`, the time the request arrived.
+    Returns a tuple: `(deadline, None)`, or `(None, error_message)` if the budget is illegal.
+    """
+    budget = request.headers.get(ACTION_DEADLINE_HEADER) if ACTION_DEADLINE_HEADER else None
+    if budget is None and isinstance(data, dict):
+        budget = data.get(ACTION_DEADLINE_FIELD)
+    if budget is None:
+        budget = ACTION_DEADLINE_DEFAULT_MS
+        if budget is None:
+            return None, None
+    try:
+        budget = int(budget)
+    except (TypeError, ValueError):
+        return None, f"ERROR: Illegal deadline '{budget}', it must be an integer of milliseconds."
+    if budget <= 0:
+        return None, f"ERROR: Illegal deadline '{budget}', it must be greater than 0."
+    if ACTION_DEADLINE_MAX_MS is not None:
+        budget = min(budget, ACTION_DEADLINE_MAX_MS)
+    return start + budget / 1000, None
+
+
+class StatementTimeout(object):
+    """
+    A django DB execute wrapper, to give every query the remaining time before `deadline` as its timeout:
+        mysql       The 'MAX_EXECUTION_TIME' optimizer hint, for SELECT statements.
+        postgresql  'SET statement_timeout' before each query, reset by `statement_timeout` at last.
+        sqlite      A progress handler, which interrupts the query once the deadline is exceeded.
+    No query starts after the deadline, `DeadlineExceeded` is raised instead.
+    """
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.pg_connections = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(DEADLINE_EXCEEDED_MESSAGE)
+        ms = max(1, int(remaining * 1000))
+        connection = context['connection']
+
+        if connection.vendor == 'mysql':
+            stripped = sql.lstrip()
+            if stripped[:6].upper() == 'SELECT':
+                sql = f"SELECT /*+ MAX_EXECUTION_TIME({ms}) */{stripped[6:]}"
+        elif connection.vendor == 'postgresql':
+            context['cursor'].cursor.execute(f"SET statement_timeout = {ms}")
+            self.pg_connections.add(connection)
+        elif connection.vendor == 'sqlite':
+            deadline = self.deadline
+            connection.connection.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                connection.connection.set_progress_handler(None, 0)
+        return execute(sql, params, many, context)
+
+    def reset(self):
+        for connection in self.pg_connections:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("RESET statement_timeout")
+            except DatabaseError:
+                pass  # In a failed transaction, which will be rolled back with the setting.
+
+
+@contextmanager
+def statement_timeout(deadline):
+    """
+    To apply `StatementTimeout` to all DB connections of current thread.
+    """
+    wrapper = StatementTimeout(deadline)
+    with ExitStack() as stack:
+        stack.callback(wrapper.reset)
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+def deadline_exceeded(handler):
+    remaining = handler.remainingTime()
+    return remaining is not None and remaining <= 0
+
+
+def run_with_deadline(handler, action_func):
+    """
+    To run `action_func` with DB statement timeouts by deadline of `handler`.
+    The deadline is only enforced before and during running: the handler fails with status 504 if it is exceeded
+    before running, or a DB query fails by it. Once the action has completed, its own result is returned,
+    since it may have written data, which the caller must not take as failed.
+    """
+    if handler.deadline is None:
+        return action_func()
+    if deadline_exceeded(handler):
+        return handler.error(DEADLINE_EXCEEDED_MESSAGE, http_status=504)
+    try:
+        with statement_timeout(handler.deadline):
+            return action_func()
+    except DatabaseError:
+        if not deadline_exceeded(handler):
+            raise
+    handler.data = None
+    return handler.error(DEADLINE_EXCEEDED_MESSAGE, http_status=504)
+
+
+async def await_with_deadline(handler, action_coroutine):
+    """
+    To await an `async def` action with the deadline of `handler` as timeout.
+    """
+    remaining = handler.remainingTime()
+    if remaining is None:
+        return await action_coroutine
+    if remaining <= 0:
+        action_coroutine.close()
+        return handler.error(DEADLINE_EXCEEDED_MESSAGE, http_status=504)
+    try:
+        return await asyncio.wait_for(action_coroutine, remaining)
+    except asyncio.TimeoutError:
+        handler.data = None
+        return handler.error(DEADLINE_EXCEEDED_MESSAGE, http_status=504)
@@ -1,9 +1,51 @@
+from contextlib import nullcontext
 from functools import wraps
+from inspect import iscoroutinefunction
+from time import perf_counter
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from .api_field_types import BoolType, IntType
+from django.db import transaction
+from .api_field_types import BoolType, IntType, resolving
+from . import action_cache, coalesce
+from collections import namedtuple
+from types import MappingProxyType
 
 
-def _dataValidate(self, req, opt):
+# A validation plan compiled from `req`/`opt` of `dataValidator` and `post_fields` of a handler class:
+#   required        Tuple of required field names.
+#   fields          Read-only mapping of all accepted field names to their field types, required ones first.
+#   bool_defaults   Read-only mapping of optional `BoolType` fields to their default values.
+#   lookups         Tuple of field names with `ObjectType` lookups, to be resolved in batch. See `api_field_types.resolving`.
+ValidationPlan = namedtuple('ValidationPlan', ['required', 'fields', 'bool_defaults', 'lookups'])
+
+
+def compile_validation_plan(handler_class, req, opt):
+    """
+    To resolve field types of `req` and `opt` in `post_fields` of `handler_class` only once.
+    Handlers with `do_pagination = True` accept 'page_index' and 'page_length' optionally, as `IntType(min=1)` if not declared.
+    """
+    post_fields = handler_class.post_fields
+    names = list(req) + [f for f in opt if f not in req]
+    pagination = {}
+    if getattr(handler_class, 'do_pagination', False):
+        for field in ('page_index', 'page_length'):
+            if field not in names:
+                names.append(field)
+            if post_fields.get(field) is None:
+                pagination[field] = IntType(min=1)
+
+    fields = {}
+    for field in names:
+        field_type = post_fields.get(field) or pagination.get(field)
+        if field_type is None:
+            raise KeyError(f"Field '{field}' of '{handler_class.__name__}' is not declared in `post_fields`.")
+        fields[field] = field_type
+    bool_defaults = {f: fields[f].default for f in opt if isinstance(fields[f], BoolType)}
+    lookups = tuple(f for f, field_type in fields.items() if field_type.has_lookups())
+    return ValidationPlan(tuple(req), MappingProxyType(fields), MappingProxyType(bool_defaults), lookups)
+
+
+def _dataValidate(self, plan):
     """
     Not a decorator.
     Used in decorator `dataValidator`.
@@ -11,22 +53,33 @@ def _dataValidate(self, req, opt):
     if self.set_parameters_directly:
         return True
 
-    _fd = self.post_fields
+    params = self.params
     # To check `req` fields first.
-    for field in req:
-        if field not in self.params:
+    for field in plan.required:
+        if field not in params:
             return self.error(f"ERROR: Field '{field}' is required.", return_value=False)
 
     # To set BoolType field in `opt` with default value.
-    self.checked_params = {f: _fd[f].default for f in filter(lambda f: isinstance(_fd[f], BoolType), opt)}
-
-    # To check value of all fields. Note: field not in `req` + `opt` will be dropped directly.
-    for field in filter(lambda f: f in self.params, req + opt):
-        field_type = _fd[field]
-        checked_value, err = field_type.check(self.params[field])
-        if err is not None:
-            return self.error(err, return_value=False)
-        self.checked_params[field] = checked_value
+    self.checked_params = dict(plan.bool_defaults)
+
+    # To check value of fields provided only, by scanning the smaller one of params and plan fields.
+    # Note: fields not in `req` + `opt` will be dropped directly.
+    fields = plan.fields
+    if len(params) < len(fields):
+        provided = [f for f in params if f in fields]
+    else:
+        provided = [f for f in fields if f in params]
+    # `ObjectType` lookups of all fields are resolved in batch, one query for each model.
+    unchecked = [f for f in plan.lookups if f in params and f not in self.prechecked_params]
+    with resolving([fields[f] for f in unchecked], [params[f] for f in unchecked]) if unchecked else nullcontext():
+        for field in provided:
+            if field in self.prechecked_params:
+                self.checked_params[field] = self.prechecked_params[field]
+                continue
+            checked_value, err = fields[field].check(params[field])
+            if err is not None:
+                return self.error(err, return_value=False)
+            self.checked_params[field] = checked_value
     return True
 
 
@@ -38,33 +91,151 @@ def dataValidator(req=None, opt=None):
     Params:
         req: A list, which contains field names must be provided.
         opt: A list, which contains field names can be provided optionally.
+    `req` and `opt` are compiled into a `ValidationPlan` once for each handler class, on first call or by `APIIngressBase`.
+    `async def` handlers are supported, validating runs in a worker thread then.
     """
+    req, opt = tuple(req or ()), tuple(opt or ())
+
     def decorator(func):
+        plans = {}  # `{handler_class: ValidationPlan}`
+
+        def get_plan(handler_class):
+            plan = plans.get(handler_class)
+            if plan is None:
+                plan = plans[handler_class] = compile_validation_plan(handler_class, req, opt)
+            return plan
+
+        def check(self):
+            start = perf_counter()
+            passed = _dataValidate(self, get_plan(type(self)))
+            self.timings['validate'] = perf_counter() - start
+            return passed
+
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_validate(self, *args, **kwargs):
+                if not await sync_to_async(check)(self):
+                    return None
+                return await func(self, *args, **kwargs)
+            async_validate._validation_plan = get_plan
+            return async_validate
+
         @wraps(func)
         def validate(self, *args, **kwargs):
-            required = req if req is not None else []
-            optional = opt if opt is not None else []
-
-            # Default pagination
-            if getattr(self, 'do_pagination', False):
-                if self.post_fields.get('page_index', None) is None:
-                    self.post_fields['page_index'] = IntType(min=1)
-                if self.post_fields.get('page_length', None) is None:
-                    self.post_fields['page_length'] = IntType(min=1)
-                if 'page_index' not in optional and 'page_index' not in required:
-                    optional.append['page_index']
-                if 'page_length' not in optional and 'page_length' not in required:
-                    optional.append['page_length']
-
-            if not _dataValidate(self, required, optional):
+            if not check(self):
                 return None
             func_result = func(self, *args, **kwargs)
             return func_result
+        validate._validation_plan = get_plan
         return validate
     return decorator
 
 
-def pre_handler(req=None, opt=None, private=False, perm=None, record=False, record_label=None):
+def cacher(timeout):
+    """
+    Can only be used for API action handlers, under decorator `dataValidator`.
+    To cache results of a read-only action for `timeout` seconds, keyed by action, checked params and
+    caller's permission group. See `action_cache`.
+    Cached results are invalidated when models the action read are written by data mixins,
+    or by calling `action_cache.invalidate_model_cache`.
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_cached(self, *args, **kwargs):
+                hit, key, versions = await sync_to_async(action_cache.lookup)(self, name)
+                if hit:
+                    return None
+                func_result = await func(self, *args, **kwargs)
+                await sync_to_async(action_cache.store)(self, name, key, timeout, versions)
+                return func_result
+            return async_cached
+
+        @wraps(func)
+        def cached(self, *args, **kwargs):
+            hit, key, versions = action_cache.lookup(self, name)
+            if hit:
+                return None
+            func_result = func(self, *args, **kwargs)
+            action_cache.store(self, name, key, timeout, versions)
+            return func_result
+        return cached
+    return decorator
+
+
+def coalescer(func):
+    """
+    Can only be used for API action handlers, under decorator `dataValidator`.
+    Identical calls (same action, checked params and caller's permission group) arriving at the same process while
+    one is running, wait for it and share its result, instead of running the action again. See `coalesce`.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    if iscoroutinefunction(func):
+        @wraps(func)
+        async def async_coalesced(self, *args, **kwargs):
+            key = action_cache.make_cache_key(self, name)
+            flight, is_leader = coalesce.join(key)
+            if not is_leader:
+                shared = await sync_to_async(flight.wait, thread_sensitive=False)()
+                if shared is not None:
+                    return coalesce.copy_to(self, shared)
+                return await func(self, *args, **kwargs)
+            try:
+                func_result = await func(self, *args, **kwargs)
+            except BaseException:
+                coalesce.land(key, flight)
+                raise
+            coalesce.land(key, flight, self)
+            return func_result
+        return async_coalesced
+
+    @wraps(func)
+    def coalesced(self, *args, **kwargs):
+        key = action_cache.make_cache_key(self, name)
+        flight, is_leader = coalesce.join(key)
+        if not is_leader:
+            shared = flight.wait()
+            if shared is not None:
+                return coalesce.copy_to(self, shared)
+            return func(self, *args, **kwargs)
+        try:
+            func_result = func(self, *args, **kwargs)
+        except BaseException:
+            coalesce.land(key, flight)
+            raise
+        coalesce.land(key, flight, self)
+        return func_result
+    return coalesced
+
+
+def transactional(func):
+    """
+    Can only be used for API action handlers.
+    To run the action in one DB transaction if `self.atomic`, set by the ingress for write actions. See `db_routing.route_action`.
+    The transaction is rolled back if the action fails.
+    `async def` actions are not supported, their DB queries run in other threads.
+    """
+    if iscoroutinefunction(func):
+        return func
+
+    @wraps(func)
+    def atomic(self, *args, **kwargs):
+        if not self.atomic:
+            return func(self, *args, **kwargs)
+        with transaction.atomic():
+            func_result = func(self, *args, **kwargs)
+            if not self.result:
+                transaction.set_rollback(True)
+        return func_result
+    return atomic
+
+
+def pre_handler(req=None, opt=None, private=False, perm=None, record=False, record_label=None, readonly=False, compress=True, etag=False,
+                cache=None, coalesce=False, max_concurrency=None, queue_timeout=None, max_body_size=None, stream_list=None,
+                max_age=None, replica=True, atomic=None, sync_cursor=None):
     """
     Can only be used for API action handlers.
     To integrate other decorators together, with `permissionChecker` and `recorder` pluggable by django settings.
@@ -75,8 +246,46 @@ def pre_handler(req=None, opt=None, private=False, perm=None, record=False, reco
         perm            Pass to decorator `permissionChecker`. If None, Means do not check user's permission for this handler.
         record          Only useful when django app 'corelib.recorder' is installed. If True, handler calling will be recorded.
         record_label    A readable name for action to record.
+        readonly        If 'True', means this action never writes data. Read-only actions in a batch request can run in parallel,
+                        can be called by GET method with params in query string, and read from a replica DB if any.
+        compress        If 'False', response of this action will never be compressed.
+        etag            If 'True', successful responses carry an ETag computed over response content,
+                        and '304 Not Modified' is returned when it matches request's 'If-None-Match'.
+                        Use it for read-only actions. Handlers can also call `self.setETag(version)` with a cheap version key.
+        cache           Seconds to cache results of a read-only action, in django cache `ACTION_CACHE_ALIAS`. None means no cache.
+                        Results are keyed by checked params and caller's permission group, and invalidated when models
+                        read by `getList`/`getDetail` are written by data mixins. See `cacher`.
+                        Requires a cache shared by all processes as `ACTION_CACHE_ALIAS`, checked when the ingress is created.
+        coalesce        If 'True', identical calls of a read-only action arriving at the same process while one is running,
+                        share its result instead of running again. See `coalescer`.
+        max_concurrency Max number of concurrent executions of this action on a host, shared by all worker processes.
+                        Requests over the limit are rejected fast with `ACTION_CONCURRENCY_REJECT_STATUS`. None means no limit.
+        queue_timeout   Seconds a request over `max_concurrency` can wait for a free slot before rejected.
+        max_body_size   Max bytes size of request body of this action, instead of `ACTION_MAX_BODY_SIZE`.
+                        Checked before reading request body only if the action is hinted by query string `?action=...`.
+        stream_list     Name of a `ListType` field, to be loaded incrementally with its items checked one by one,
+                        when the action is hinted by query string `?action=...` and package 'ijson' is installed.
+        max_age         Seconds responses of GET calls can be cached by proxies and CDN, by 'Cache-Control: max-age'.
+                        If None, they must be revalidated every time, which is cheap with `etag`.
+        replica         If 'False', this read-only action reads from the primary DB, e.g. to read data just written.
+                        Otherwise from a replica in `ACTION_READ_REPLICAS`. See `db_routing.ActionDBRouter`.
+        atomic          If 'True', this write action runs in one DB transaction, rolled back if the action fails.
+                        None means `ACTION_ATOMIC_WRITES`. Calling records by `record` are kept out of the transaction.
+                        Not supported by `async def` actions, which never run in a transaction.
+        sync_cursor     Name of a field in `req`/`opt`, to enable delta syncs of `ListDataMixin.getList` in this action:
+                        a request carrying the field gets rows changed after the cursor in it. See `delta_sync`.
+                        Requires a cache shared by all processes as `ACTION_CACHE_ALIAS`, checked when the ingress is created.
+
+    Both normal methods and `async def` methods can be decorated. See `AsyncAPIIngressBase` for async handlers.
     """
     def decorator(func):
+        if atomic and iscoroutinefunction(func):
+            raise TypeError(f"`atomic` is not supported by `async def` action '{func.__qualname__}', its DB queries run in different threads.")
+        if coalesce:
+            func = coalescer(func)
+        if cache is not None:
+            func = cacher(cache)(func)
+        func = transactional(func)
         func = dataValidator(req, opt)(func)
         if 'corelib.recorder' in settings.INSTALLED_APPS and record:
             from corelib.recorder.decorators import recorder
@@ -86,5 +295,17 @@ def pre_handler(req=None, opt=None, private=False, perm=None, record=False, reco
             func = permissionChecker(perm)(func)
 
         func._is_private = private
+        func._is_readonly = readonly
+        func._compress = compress
+        func._etag = etag
+        func._max_concurrency = max_concurrency
+        func._queue_timeout = queue_timeout
+        func._max_body_size = max_body_size
+        func._stream_list = stream_list
+        func._max_age = max_age
+        func._cache = cache
+        func._replica = replica
+        func._atomic = atomic
+        func._sync_cursor = sync_cursor
         return func
     return decorator
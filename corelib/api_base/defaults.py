@@ -1,11 +1,109 @@
 from django.conf import settings
+import os
+import tempfile
 
 
 # Defaults.
 _ACTION_AUTH_REQUIRED = False  # A global authencating switch. Set it to False for developing.
 _ACTIONS_AUTH_BY_PASS = ['login']  # Even though `AUTH_REQUIRED` is True, actions in this list can be by pass API authentication.
+_ACTION_BATCH_MAX_SIZE = 50  # Max number of actions one batch request can carry.
+_ACTION_BATCH_MAX_WORKERS = 4  # Max threads to run read-only actions of a batch request in parallel.
+_ACTION_FANOUT_MAX_WORKERS = 6  # Max threads of `APIHandlerBase.runInParallel` to run other handlers concurrently.
+_ACTION_COMPRESS_RESPONSE = True  # To compress responses negotiated by 'Accept-Encoding'.
+_ACTION_COMPRESS_MIN_SIZE = 1024  # Responses smaller than this bytes size will not be compressed.
+_ACTION_COMPRESS_ENCODINGS = ['zstd', 'br', 'gzip']  # Server preference. 'br' needs package 'brotli', 'zstd' needs 'zstandard'.
+_ACTION_JSON_CODEC = 'auto'  # 'auto', 'json', 'orjson', or a dotted path of a custom codec class. See `json_codec.get_codec`.
+_ACTION_MAX_BODY_SIZE = None  # Max bytes size of request body, checked before reading. None means no limit but django's own.
+_ACTION_WIRE_CODECS = ['msgpack', 'cbor']  # Binary codecs negotiated by 'Content-Type'/'Accept'. Need package 'msgpack', 'cbor2'.
+_ACTION_DEADLINE_HEADER = 'X-Action-Deadline-Ms'  # Header carrying a client's deadline, as a budget in milliseconds.
+_ACTION_DEADLINE_FIELD = '__deadline_ms__'  # The reserved post data field carrying a deadline, if the header is not provided.
+_ACTION_DEADLINE_DEFAULT_MS = None  # Deadline of requests carrying no deadline. None means no deadline.
+_ACTION_DEADLINE_MAX_MS = None  # Max deadline a client can ask for. None means no limit.
+_ACTION_READ_REPLICAS = []  # DB aliases to route reads of read-only actions to, needs `db_routing.ActionDBRouter` in `DATABASE_ROUTERS`.
+_ACTION_ATOMIC_WRITES = False  # To run each write action in one DB transaction, rolled back if the action fails.
+_ACTION_ERROR_LOG_ENABLED = True  # To log errors of actions as JSON lines, by a background thread. See `error_log`.
+_ACTION_ERROR_LOG_FILE = None  # File path of error logs, None means stdout.
+_ACTION_ERROR_LOG_QUEUE_SIZE = 10000  # Error logs over this number waiting to be written are dropped.
+_ACTION_ERROR_LOG_REDACT_FIELDS = ['password', 'passwd', 'secret', 'token', 'key']  # Params with these in names are masked.
+_ACTION_ERROR_LOG_MAX_VALUE_LENGTH = 200  # Longer strings in params are truncated.
+_ACTION_ERROR_LOG_MAX_ITEMS = 20  # Lists and dicts in params are truncated to this number of items.
+_ACTION_ERROR_LOG_SAMPLE_WINDOW = 60  # Seconds of a sampling window.
+_ACTION_ERROR_LOG_SAMPLE_BURST = 10  # Max times an identical error is logged in a sampling window.
+_ACTION_ALLOW_GET = True  # Read-only actions can be called by GET with params in query string, so that responses can be cached by CDN.
+_ACTION_CACHE_ALIAS = 'default'  # Alias in django `CACHES` setting, to cache results of actions with `pre_handler(cache=...)`.
+_ACTION_CACHE_KEY_PREFIX = 'action_cache'
+_ACTION_SYNC_MAX_ROWS = 1000  # Max rows a delta sync of `ListDataMixin.getList` returns at once.
+_ACTION_SYNC_LAG = 1  # Seconds. Rows changed lately are left to the next delta sync, for transactions committed late.
+_ACTION_SYNC_TOMBSTONE_TIMEOUT = 86400  # Seconds to keep ids of deleted rows for delta syncs, in cache `ACTION_CACHE_ALIAS`.
+_ACTION_METRICS_ENABLED = True  # To collect per-action metrics, exposed by `metrics.ActionMetricsView`.
+_ACTION_METRICS_LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]  # In seconds.
+_ACTION_METRICS_SIZE_BUCKETS = [256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304]  # In bytes.
+_ACTION_CONCURRENCY_LOCK_DIR = os.path.join(tempfile.gettempdir(), 'action_concurrency')  # Lock files of concurrency slots.
+_ACTION_CONCURRENCY_REJECT_STATUS = 503  # Response status when an action is over its `max_concurrency`, 503 or 429.
+_ACTION_COALESCE_TIMEOUT = 30  # Seconds a coalesced request waits for the identical running one, before running by itself.
 
 
 # By pass API authentication settings.
 ACTION_AUTH_REQUIRED = getattr(settings, 'ACTION_AUTH_REQUIRED', _ACTION_AUTH_REQUIRED)
 ACTIONS_AUTH_BY_PASS = getattr(settings, 'ACTIONS_AUTH_BY_PASS', _ACTIONS_AUTH_BY_PASS)
+
+# Batch request and fan-out settings.
+ACTION_BATCH_MAX_SIZE = getattr(settings, 'ACTION_BATCH_MAX_SIZE', _ACTION_BATCH_MAX_SIZE)
+ACTION_BATCH_MAX_WORKERS = getattr(settings, 'ACTION_BATCH_MAX_WORKERS', _ACTION_BATCH_MAX_WORKERS)
+ACTION_FANOUT_MAX_WORKERS = getattr(settings, 'ACTION_FANOUT_MAX_WORKERS', _ACTION_FANOUT_MAX_WORKERS)
+
+# DB routing and transaction settings.
+ACTION_READ_REPLICAS = getattr(settings, 'ACTION_READ_REPLICAS', _ACTION_READ_REPLICAS)
+ACTION_ATOMIC_WRITES = getattr(settings, 'ACTION_ATOMIC_WRITES', _ACTION_ATOMIC_WRITES)
+
+# Error logging settings.
+ACTION_ERROR_LOG_ENABLED = getattr(settings, 'ACTION_ERROR_LOG_ENABLED', _ACTION_ERROR_LOG_ENABLED)
+ACTION_ERROR_LOG_FILE = getattr(settings, 'ACTION_ERROR_LOG_FILE', _ACTION_ERROR_LOG_FILE)
+ACTION_ERROR_LOG_QUEUE_SIZE = getattr(settings, 'ACTION_ERROR_LOG_QUEUE_SIZE', _ACTION_ERROR_LOG_QUEUE_SIZE)
+ACTION_ERROR_LOG_REDACT_FIELDS = getattr(settings, 'ACTION_ERROR_LOG_REDACT_FIELDS', _ACTION_ERROR_LOG_REDACT_FIELDS)
+ACTION_ERROR_LOG_MAX_VALUE_LENGTH = getattr(settings, 'ACTION_ERROR_LOG_MAX_VALUE_LENGTH', _ACTION_ERROR_LOG_MAX_VALUE_LENGTH)
+ACTION_ERROR_LOG_MAX_ITEMS = getattr(settings, 'ACTION_ERROR_LOG_MAX_ITEMS', _ACTION_ERROR_LOG_MAX_ITEMS)
+ACTION_ERROR_LOG_SAMPLE_WINDOW = getattr(settings, 'ACTION_ERROR_LOG_SAMPLE_WINDOW', _ACTION_ERROR_LOG_SAMPLE_WINDOW)
+ACTION_ERROR_LOG_SAMPLE_BURST = getattr(settings, 'ACTION_ERROR_LOG_SAMPLE_BURST', _ACTION_ERROR_LOG_SAMPLE_BURST)
+
+# GET method for read-only actions.
+ACTION_ALLOW_GET = getattr(settings, 'ACTION_ALLOW_GET', _ACTION_ALLOW_GET)
+
+# Max bytes size of request body. Actions can have their own by `pre_handler(max_body_size=...)`.
+ACTION_MAX_BODY_SIZE = getattr(settings, 'ACTION_MAX_BODY_SIZE', _ACTION_MAX_BODY_SIZE)
+
+# Codec to load request body and render response data.
+ACTION_JSON_CODEC = getattr(settings, 'ACTION_JSON_CODEC', _ACTION_JSON_CODEC)
+ACTION_WIRE_CODECS = getattr(settings, 'ACTION_WIRE_CODECS', _ACTION_WIRE_CODECS)
+
+# Response compression settings.
+ACTION_COMPRESS_RESPONSE = getattr(settings, 'ACTION_COMPRESS_RESPONSE', _ACTION_COMPRESS_RESPONSE)
+ACTION_COMPRESS_MIN_SIZE = getattr(settings, 'ACTION_COMPRESS_MIN_SIZE', _ACTION_COMPRESS_MIN_SIZE)
+ACTION_COMPRESS_ENCODINGS = getattr(settings, 'ACTION_COMPRESS_ENCODINGS', _ACTION_COMPRESS_ENCODINGS)
+
+# Deadline settings.
+ACTION_DEADLINE_HEADER = getattr(settings, 'ACTION_DEADLINE_HEADER', _ACTION_DEADLINE_HEADER)
+ACTION_DEADLINE_FIELD = getattr(settings, 'ACTION_DEADLINE_FIELD', _ACTION_DEADLINE_FIELD)
+ACTION_DEADLINE_DEFAULT_MS = getattr(settings, 'ACTION_DEADLINE_DEFAULT_MS', _ACTION_DEADLINE_DEFAULT_MS)
+ACTION_DEADLINE_MAX_MS = getattr(settings, 'ACTION_DEADLINE_MAX_MS', _ACTION_DEADLINE_MAX_MS)
+
+# Action result cache settings.
+ACTION_CACHE_ALIAS = getattr(settings, 'ACTION_CACHE_ALIAS', _ACTION_CACHE_ALIAS)
+ACTION_CACHE_KEY_PREFIX = getattr(settings, 'ACTION_CACHE_KEY_PREFIX', _ACTION_CACHE_KEY_PREFIX)
+
+# Delta sync settings.
+ACTION_SYNC_MAX_ROWS = getattr(settings, 'ACTION_SYNC_MAX_ROWS', _ACTION_SYNC_MAX_ROWS)
+ACTION_SYNC_LAG = getattr(settings, 'ACTION_SYNC_LAG', _ACTION_SYNC_LAG)
+ACTION_SYNC_TOMBSTONE_TIMEOUT = getattr(settings, 'ACTION_SYNC_TOMBSTONE_TIMEOUT', _ACTION_SYNC_TOMBSTONE_TIMEOUT)
+
+# Concurrency limiting settings.
+ACTION_CONCURRENCY_LOCK_DIR = getattr(settings, 'ACTION_CONCURRENCY_LOCK_DIR', _ACTION_CONCURRENCY_LOCK_DIR)
+ACTION_CONCURRENCY_REJECT_STATUS = getattr(settings, 'ACTION_CONCURRENCY_REJECT_STATUS', _ACTION_CONCURRENCY_REJECT_STATUS)
+
+# Request coalescing settings.
+ACTION_COALESCE_TIMEOUT = getattr(settings, 'ACTION_COALESCE_TIMEOUT', _ACTION_COALESCE_TIMEOUT)
+
+# Action metrics settings.
+ACTION_METRICS_ENABLED = getattr(settings, 'ACTION_METRICS_ENABLED', _ACTION_METRICS_ENABLED)
+ACTION_METRICS_LATENCY_BUCKETS = getattr(settings, 'ACTION_METRICS_LATENCY_BUCKETS', _ACTION_METRICS_LATENCY_BUCKETS)
+ACTION_METRICS_SIZE_BUCKETS = getattr(settings, 'ACTION_METRICS_SIZE_BUCKETS', _ACTION_METRICS_SIZE_BUCKETS)
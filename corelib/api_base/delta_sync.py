@@ -0,0 +1,162 @@
+from django.db import transaction
+from django.db.models import Q, DateTimeField
+from django.utils import timezone
+from .action_cache import get_cache, check_shared_cache
+from .defaults import ACTION_CACHE_KEY_PREFIX, ACTION_SYNC_MAX_ROWS, ACTION_SYNC_LAG, ACTION_SYNC_TOMBSTONE_TIMEOUT
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from datetime import timedelta
+import json
+import time
+
+# Max number of tombstones a delta can carry, a client further behind has to resync.
+_MAX_TOMBSTONES = 10000
+
+
+class CursorError(ValueError):
+    pass
+
+
+def get_sync_field(model):
+    """
+    To get the change tracking field of `model`, declared by model attribute `sync_field`, or None if not tracked.
+    The field must be updated on every change, and increase over time: a `DateTimeField(auto_now=True, db_index=True)`,
+    or a version column increased globally by the application.
+    """
+    name = getattr(model, 'sync_field', None)
+    return model._meta.get_field(name) if name else None
+
+
+def check_sync_cursor(handler_class, field, validation_plan):
+    """
+    To check `field` declared by `pre_handler(sync_cursor=...)` is validated as a field in `req`/`opt` of the action,
+    and cache `ACTION_CACHE_ALIAS` is shared by all processes. Tombstones and their sequences are kept in the cache,
+    a process-local one would make syncs served by different processes miss deleted rows, or reset again and again.
+    """
+    if validation_plan is None or field not in validation_plan.fields:
+        raise TypeError(f"`sync_cursor` field '{field}' of '{handler_class.__name__}' must be in `req` or `opt`, declared in `post_fields`.")
+    check_shared_cache(handler_class, 'Delta sync')
+
+
+def touch(model, values=None, update_fields=None):
+    """
+    `auto_now` fields are not updated by `QuerySet.update()` and `save(update_fields=...)`.
+    To add the datetime sync field of `model` to `values` of the former, or `update_fields` of the latter.
+    Returns the `values` dict, or the `update_fields` list.
+    """
+    field = get_sync_field(model)
+    if update_fields is not None:
+        if field is not None and field.name not in update_fields:
+            update_fields = list(update_fields) + [field.name]
+        return update_fields
+    values = dict(values or {})
+    if isinstance(field, DateTimeField):
+        values.setdefault(field.name, timezone.now())
+    return values
+
+
+def _seq_key(label):
+    return f"{ACTION_CACHE_KEY_PREFIX}:tombstone_seq:{label}"
+
+
+def _tombstone_key(label, seq):
+    return f"{ACTION_CACHE_KEY_PREFIX}:tombstone:{label}:{seq}"
+
+
+def record_tombstones(model, ids):
+    """
+    To record `ids` of deleted rows of a change tracked `model`, so that delta syncs return them as deleted.
+    Tombstones are kept in django cache `ACTION_CACHE_ALIAS` for `ACTION_SYNC_TOMBSTONE_TIMEOUT` seconds,
+    numbered by a sequence per model. In a DB transaction, it takes effect after the transaction committed.
+    """
+    if get_sync_field(model) is None or not ids:
+        return
+    label, ids = model._meta.label, list(ids)
+
+    def record():
+        cache = get_cache()
+        try:
+            seq = cache.incr(_seq_key(label))
+        except ValueError:
+            # Never recorded, or evicted. Start from a new unique value, so that old cursors never match.
+            cache.add(_seq_key(label), time.time_ns(), None)
+            seq = cache.incr(_seq_key(label))
+        cache.set(_tombstone_key(label, seq), ids, ACTION_SYNC_TOMBSTONE_TIMEOUT)
+    transaction.on_commit(record)
+
+
+def _current_seq(label):
+    """
+    A missing sequence (never recorded, or evicted) is initialized with a new unique value, like `record_tombstones` does.
+    """
+    cache = get_cache()
+    seq = cache.get(_seq_key(label))
+    if seq is None:
+        cache.add(_seq_key(label), time.time_ns(), None)
+        seq = cache.get(_seq_key(label))
+    return seq
+
+
+def _tombstones_since(label, seq, current):
+    """
+    Returns ids deleted after tombstone `seq` till `current`, or None if any of them is lost.
+    """
+    if current < seq or current - seq > _MAX_TOMBSTONES:
+        return None
+    keys = [_tombstone_key(label, s) for s in range(seq + 1, current + 1)]
+    found = get_cache().get_many(keys) if keys else {}
+    if len(found) != len(keys):
+        return None
+    return [pk for key in keys for pk in found[key]]
+
+
+def make_cursor(value, pk, seq):
+    raw = json.dumps([None if value is None else str(value), pk, seq], separators=(',', ':'))
+    return urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def parse_cursor(field, cursor):
+    """
+    Returns `(value, pk, seq)` of a cursor made by `make_cursor`. Raises `CursorError` if illegal.
+    """
+    try:
+        value, pk, seq = json.loads(urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return (None if value is None else field.to_python(value)), pk, int(seq)
+    except Exception:
+        raise CursorError(f"ERROR: Illegal sync cursor '{cursor}'.")
+
+
+def get_changes(queryset, model, cursor):
+    """
+    To get rows of `queryset` created or changed after `cursor`, and ids deleted after it.
+    An empty cursor means from the beginning. Rows are ordered by the sync field and pk, at most `ACTION_SYNC_MAX_ROWS`.
+    With a datetime sync field, rows changed in the last `ACTION_SYNC_LAG` seconds are left to the next sync, so that
+    rows written by transactions committed late are not skipped.
+
+    Returns a tuple `(rows, deleted_ids, new_cursor, has_more, reset)`. `reset` is True if the cursor is too old to get
+    deleted ids (tombstones expired or evicted), then all rows are returned from the beginning, as with an empty cursor.
+    Raises `CursorError` if the cursor is illegal.
+    """
+    field = get_sync_field(model)
+    label = model._meta.label
+    current_seq = _current_seq(label)
+    value = pk = None
+    deleted, reset = [], False
+    if cursor:
+        value, pk, seq = parse_cursor(field, cursor)
+        deleted = _tombstones_since(label, seq, current_seq)
+        if deleted is None:
+            value = pk = None
+            deleted, reset = [], True
+
+    queryset = queryset.order_by(field.name, 'pk')
+    if value is not None:
+        queryset = queryset.filter(Q(**{f'{field.name}__gt': value}) | Q(**{field.name: value, 'pk__gt': pk}))
+    if isinstance(field, DateTimeField) and ACTION_SYNC_LAG:
+        queryset = queryset.filter(**{f'{field.name}__lte': timezone.now() - timedelta(seconds=ACTION_SYNC_LAG)})
+    rows = list(queryset[:ACTION_SYNC_MAX_ROWS + 1])
+    has_more = len(rows) > ACTION_SYNC_MAX_ROWS
+    if has_more:
+        rows = rows[:ACTION_SYNC_MAX_ROWS]
+    if rows:
+        value, pk = getattr(rows[-1], field.attname), rows[-1].pk
+    return rows, deleted, make_cursor(value, pk, current_seq), has_more, reset
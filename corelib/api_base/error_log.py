@@ -0,0 +1,151 @@
+from .defaults import (
+    ACTION_ERROR_LOG_ENABLED, ACTION_ERROR_LOG_FILE, ACTION_ERROR_LOG_QUEUE_SIZE, ACTION_ERROR_LOG_REDACT_FIELDS,
+    ACTION_ERROR_LOG_MAX_VALUE_LENGTH, ACTION_ERROR_LOG_MAX_ITEMS, ACTION_ERROR_LOG_SAMPLE_WINDOW, ACTION_ERROR_LOG_SAMPLE_BURST)
+from datetime import datetime
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+REDACTED = '***'
+_MAX_DEPTH = 4
+_MAX_SAMPLE_KEYS = 10000
+
+
+def truncate(value, depth=0):
+    """
+    To make a value small and JSON serializable for logging: long strings are cut to `ACTION_ERROR_LOG_MAX_VALUE_LENGTH`,
+    lists and dicts to `ACTION_ERROR_LOG_MAX_ITEMS` items, values of redacted fields are masked,
+    and other objects (like querysets) are replaced by their type names without being evaluated.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if len(value) > ACTION_ERROR_LOG_MAX_VALUE_LENGTH:
+            return f"{value[:ACTION_ERROR_LOG_MAX_VALUE_LENGTH]}...({len(value)} chars)"
+        return value
+    if depth >= _MAX_DEPTH:
+        return f"<{type(value).__name__}>"
+    if isinstance(value, dict):
+        result = {}
+        for i, (key, item) in enumerate(value.items()):
+            if i >= ACTION_ERROR_LOG_MAX_ITEMS:
+                result['...'] = f"({len(value)} items)"
+                break
+            key = str(key)
+            result[key] = REDACTED if _is_redacted(key) else truncate(item, depth + 1)
+        return result
+    if isinstance(value, (list, tuple)):
+        result = [truncate(item, depth + 1) for item in value[:ACTION_ERROR_LOG_MAX_ITEMS]]
+        if len(value) > ACTION_ERROR_LOG_MAX_ITEMS:
+            result.append(f"...({len(value)} items)")
+        return result
+    return f"<{type(value).__name__}>"
+
+
+def _is_redacted(key):
+    key = key.lower()
+    return any(field in key for field in ACTION_ERROR_LOG_REDACT_FIELDS)
+
+
+class ErrorLogger(object):
+    """
+    To log errors of actions as JSON lines, written by a background thread, so that a request never waits for stdout.
+    On the request thread, it only samples and puts a record into a bounded queue:
+        sampling    Identical errors (same action, status and message) are logged at most `burst` times in each
+                    `window` seconds, the rest are counted and reported as 'suppressed' with the next logged one.
+        queue       When the queue is full, records are dropped and counted as 'dropped' instead of blocking.
+    Records are redacted and truncated by the background thread, see `truncate`.
+    """
+    def __init__(self, log_file=None, queue_size=ACTION_ERROR_LOG_QUEUE_SIZE,
+                 window=ACTION_ERROR_LOG_SAMPLE_WINDOW, burst=ACTION_ERROR_LOG_SAMPLE_BURST):
+        self.log_file = log_file
+        self.queue_size = queue_size
+        self.window = window
+        self.burst = burst
+        self.lock = threading.Lock()
+        self.samples = {}  # `{error_key: [window_start, count_in_window, suppressed]}`
+        self.dropped = 0
+        self.pid = None
+        self.queue = None
+
+    def log(self, error_message, status_code=400, action=None, request_params=None, data=None):
+        key = (action, status_code, error_message)
+        now = time.monotonic()
+        with self.lock:
+            sample = self.samples.get(key)
+            if sample is None or now - sample[0] >= self.window:
+                if len(self.samples) >= _MAX_SAMPLE_KEYS:
+                    self.samples.clear()  # Too many distinct errors, to keep memory bounded.
+                suppressed = sample[2] if sample is not None else 0
+                sample = self.samples[key] = [now, 0, 0]
+            else:
+                suppressed = 0
+            if sample[1] >= self.burst:
+                sample[2] += 1
+                return
+            sample[1] += 1
+            record = {
+                'time': datetime.now().isoformat(timespec='milliseconds'),
+                'action': action,
+                'status_code': status_code,
+                'error_message': error_message,
+                'request_params': dict(request_params) if isinstance(request_params, dict) else request_params,
+                'data': data,
+            }
+            if suppressed:
+                record['suppressed'] = suppressed
+            self.put(record)
+
+    def put(self, record):
+        if self.pid != os.getpid():
+            self.start()
+        if self.dropped:
+            record['dropped'], self.dropped = self.dropped, 0
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1 + record.pop('dropped', 0)
+
+    def start(self):
+        """
+        To start the writer thread, again in a forked process.
+        """
+        self.pid = os.getpid()
+        self.queue = queue.Queue(self.queue_size)
+        threading.Thread(target=self.write, args=(self.queue,), name='action-error-log', daemon=True).start()
+
+    def write(self, records):
+        f = open(self.log_file, 'a', encoding='utf-8') if self.log_file else sys.stdout
+        while True:
+            record = records.get()
+            try:
+                record['request_params'] = truncate(record['request_params'])
+                record['data'] = truncate(record['data'])
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                if records.empty():
+                    f.flush()
+            except Exception:
+                pass  # Never break the writer by a bad record.
+            finally:
+                records.task_done()
+
+    def flush(self):
+        """
+        To wait until all queued records are written.
+        """
+        if self.queue is not None and self.pid == os.getpid():
+            self.queue.join()
+
+
+# Error logger of this process.
+error_logger = ErrorLogger(ACTION_ERROR_LOG_FILE)
+atexit.register(error_logger.flush)
+
+
+def log_error(error_message, status_code=400, action=None, request_params=None, data=None):
+    if ACTION_ERROR_LOG_ENABLED:
+        error_logger.log(error_message, status_code, action, request_params, data)
@@ -0,0 +1,99 @@
+from .api_field_types import ListType, resolving
+
+# Optional incremental JSON parser.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_SCALAR_EVENTS = {'null', 'boolean', 'integer', 'double', 'number', 'string'}
+
+# Number of raw items checked together, so that their `ObjectType` lookups are resolved in one query.
+_CHECK_BATCH_SIZE = 200
+
+
+class IncrementalLoadError(Exception):
+    pass
+
+
+def check_stream_field(handler_class, field):
+    """
+    To check `field` declared by `pre_handler(stream_list=...)` is a `ListType` field of `handler_class`.
+    """
+    field_type = handler_class.post_fields.get(field)
+    if not isinstance(field_type, ListType):
+        raise TypeError(f"`stream_list` field '{field}' of '{handler_class.__name__}' must be a `ListType` field in `post_fields`.")
+    return field_type
+
+
+def load_with_stream_list(stream, field, field_type):
+    """
+    To load a JSON object from a file-like `stream` incrementally, while items of its list `field` are checked by
+    `field_type.item_type` in batches of `_CHECK_BATCH_SIZE` as soon as they are parsed.
+    Raw items are dropped once checked, so the whole raw document is never materialized.
+    A bad item stops parsing at the end of its batch, without reading the rest of the stream.
+
+    Returns the loaded dict with checked items as value of `field`.
+    Raises `IncrementalLoadError` if it is not a JSON object, or any item is not valid.
+    """
+    item_prefix = f"{field}.item"
+    data, items, pending = {}, [], []
+    key = builder = None
+
+    def check_pending():
+        item_type = field_type.item_type
+        with resolving([item_type] * len(pending), pending):
+            for item in pending:
+                item, err = item_type.check(item)
+                if err is not None:
+                    raise IncrementalLoadError(f"Field '{field}' item {len(items)}: {err}")
+                items.append(item)
+        pending.clear()
+
+    def add_item(item):
+        if field_type.item_type is None:
+            items.append(item)
+            return
+        pending.append(item)
+        if len(pending) >= _CHECK_BATCH_SIZE:
+            check_pending()
+
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        # Top level.
+        if prefix == '':
+            if event == 'map_key':
+                key = value
+                builder = None if key == field else ijson.ObjectBuilder()
+            elif event not in ('start_map', 'end_map'):
+                raise IncrementalLoadError("Post data is not a dict.")
+            continue
+
+        # Other fields are built normally.
+        if key != field:
+            builder.event(event, value)
+            if prefix == key and (event in _SCALAR_EVENTS or event in ('end_map', 'end_array')):
+                data[key] = builder.value
+            continue
+
+        # The list field itself.
+        if prefix == field:
+            if event == 'start_array':
+                items = []
+            elif event == 'end_array':
+                check_pending()
+                data[field] = items
+            else:
+                raise IncrementalLoadError(f"Field '{field}' is not a list.")
+            continue
+
+        # Items of the list field.
+        if prefix == item_prefix and builder is None:
+            if event in _SCALAR_EVENTS:
+                add_item(value)
+                continue
+            builder = ijson.ObjectBuilder()
+        builder.event(event, value)
+        if prefix == item_prefix and event in ('end_map', 'end_array'):
+            add_item(builder.value)
+            builder = None
+    return data
@@ -0,0 +1,190 @@
+from importlib import import_module
+from datetime import datetime, date, time
+from decimal import Decimal
+from uuid import UUID
+
+import json
+
+
+def default_serializer(obj):
+    """
+    To serialize types that JSON does not support natively.
+    Codecs must give the same output for these types, so that switching codec never changes the API.
+    """
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (Decimal, UUID)):
+        return str(obj)
+    raise TypeError(f"Object of type '{type(obj).__name__}' is not JSON serializable.")
+
+
+class JSONCodec(object):
+    """
+    The stdlib json codec. Also the top class of all codecs.
+    All sub-classes must define `loads(self, data)` to accept bytes or str, and `dumps(self, obj)` to return bytes.
+
+    :media_types    Media types of this codec in 'Content-Type' and 'Accept' headers, the first one is used in responses.
+    :streamable     Whether `APIIngressBase.stream_chunks` can render a streaming response by joining dumped rows.
+    """
+    name = 'json'
+    media_types = ('application/json',)
+    streamable = True
+
+    @property
+    def content_type(self):
+        return self.media_types[0]
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj):
+        return json.dumps(obj, default=default_serializer).encode('utf-8')
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    A much faster codec, requires package 'orjson'.
+    datetime/date/time/UUID are serialized natively in the same format as `default_serializer`.
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._option = orjson.OPT_NON_STR_KEYS
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj, default=default_serializer, option=self._option)
+
+
+class MsgpackCodec(JSONCodec):
+    """
+    MessagePack binary codec, requires package 'msgpack'.
+    """
+    name = 'msgpack'
+    media_types = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+    streamable = False
+
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+
+    def loads(self, data):
+        return self._msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+    def dumps(self, obj):
+        return self._msgpack.packb(obj, default=default_serializer, use_bin_type=True)
+
+
+class CBORCodec(JSONCodec):
+    """
+    CBOR binary codec, requires package 'cbor2'.
+    datetime/date/time/Decimal/UUID are encoded as strings by `default_serializer`, instead of CBOR tags.
+    """
+    name = 'cbor'
+    media_types = ('application/cbor',)
+    streamable = False
+
+    def __init__(self):
+        import cbor2
+        self._cbor2 = cbor2
+        encode = self._encode_by_default_serializer
+        self._encoders = {datetime: encode, date: encode, time: encode, Decimal: encode, UUID: encode}
+
+    @staticmethod
+    def _encode_by_default_serializer(encoder, value):
+        encoder.encode(default_serializer(value))
+
+    def loads(self, data):
+        return self._cbor2.loads(data)
+
+    def dumps(self, obj):
+        return self._cbor2.dumps(obj, encoders=self._encoders)
+
+
+BUILTIN_CODECS = {
+    'json': JSONCodec,
+    'orjson': OrjsonCodec,
+    'msgpack': MsgpackCodec,
+    'cbor': CBORCodec,
+}
+
+
+def get_codec(name='auto'):
+    """
+    To get a codec instance by name.
+
+    :name   'auto': to use 'orjson' if it is installed, or fall back to 'json'.
+            'json', 'orjson', 'msgpack', 'cbor': the builtin codecs.
+            Or a dotted path of a custom codec class, like 'some_django_app.codecs.MyCodec'.
+    """
+    if name == 'auto':
+        try:
+            return OrjsonCodec()
+        except ImportError:
+            return JSONCodec()
+    if name in BUILTIN_CODECS:
+        return BUILTIN_CODECS[name]()
+    module_path, _, class_name = name.rpartition('.')
+    return getattr(import_module(module_path), class_name)()
+
+
+def get_wire_codecs(names):
+    """
+    To get instances of codecs in `names`, whose packages are installed.
+    """
+    codecs = []
+    for name in names:
+        try:
+            codecs.append(get_codec(name))
+        except ImportError:
+            continue
+    return codecs
+
+
+def parse_accept(header):
+    """
+    To parse an 'Accept' header into a list of `(media_type, qvalue)`, in the order they appear.
+    """
+    accepted = []
+    for item in header.split(','):
+        media_type, *params = item.strip().split(';')
+        media_type = media_type.strip().lower()
+        if not media_type:
+            continue
+        q = 1.0
+        for param in params:
+            k, _, v = param.strip().partition('=')
+            if k.strip() == 'q':
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        accepted.append((media_type, q))
+    return accepted
+
+
+def negotiate_codecs(request, default, codecs):
+    """
+    To choose codecs for loading request body and rendering response, among `default` and `codecs`.
+
+    Request codec is chosen by 'Content-Type', `default` if not matched.
+    Response codec is the one with highest qvalue in 'Accept', the earlier one in 'Accept' wins a tie.
+    If 'Accept' matches nothing specific, like '*/*' or missing, it is the same as request codec.
+
+    Returns a tuple `(request_codec, response_codec)`.
+    """
+    if not codecs:
+        return default, default
+    content_type = request.META.get('CONTENT_TYPE', '').split(';')[0].strip().lower()
+    request_codec = next((codec for codec in codecs if content_type in codec.media_types), default)
+
+    best, best_q = None, 0.0
+    for media_type, q in parse_accept(request.META.get('HTTP_ACCEPT', '')):
+        for codec in [default] + list(codecs):
+            if media_type in codec.media_types and q > best_q:
+                best, best_q = codec, q
+    return request_codec, best if best is not None else request_codec
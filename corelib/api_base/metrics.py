@@ -0,0 +1,174 @@
+from django.views.generic import View
+from django.http import HttpResponse
+from .defaults import ACTION_METRICS_ENABLED, ACTION_METRICS_LATENCY_BUCKETS, ACTION_METRICS_SIZE_BUCKETS
+from bisect import bisect_left
+from collections import defaultdict
+import threading
+import time
+
+# Phases of handling an action request.
+PHASES = ('parse', 'auth', 'validate', 'handler', 'render')
+
+# Action label for requests failed before an action is resolved, and for batch requests.
+UNKNOWN_ACTION = '__unknown__'
+BATCH_ACTION = '__batch__'
+
+
+class Histogram(object):
+    """
+    A cumulative histogram in Prometheus style. Not thread safe, guarded by `ActionMetrics`.
+    """
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # The last one is '+Inf'.
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        """
+        To yield `(le, cumulative_count)` pairs.
+        """
+        total = 0
+        for le, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield le, total
+
+
+class ActionMetrics(object):
+    """
+    Per-action metrics of this process: request count by status code, latency histogram of each phase,
+    and response size histogram.
+    """
+    def __init__(self, latency_buckets=None, size_buckets=None):
+        self.latency_buckets = ACTION_METRICS_LATENCY_BUCKETS if latency_buckets is None else latency_buckets
+        self.size_buckets = ACTION_METRICS_SIZE_BUCKETS if size_buckets is None else size_buckets
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = defaultdict(int)  # `{(action, status): count}`
+            self.latency = {}                 # `{(action, phase): Histogram}`
+            self.sizes = {}                   # `{action: Histogram}`
+
+    def observe(self, action, status, phases, size=None):
+        """
+        :phases     A dict `{phase: seconds}`.
+        :size       Bytes size of response content, None for streaming responses.
+        """
+        with self.lock:
+            self.requests[(action, status)] += 1
+            for phase, seconds in phases.items():
+                histogram = self.latency.get((action, phase))
+                if histogram is None:
+                    histogram = self.latency[(action, phase)] = Histogram(self.latency_buckets)
+                histogram.observe(seconds)
+            if size is not None:
+                histogram = self.sizes.get(action)
+                if histogram is None:
+                    histogram = self.sizes[action] = Histogram(self.size_buckets)
+                histogram.observe(size)
+
+    def render(self):
+        """
+        To render all metrics in Prometheus text exposition format.
+        """
+        lines = [
+            '# HELP action_requests_total Number of action requests, by response status code.',
+            '# TYPE action_requests_total counter',
+        ]
+        with self.lock:
+            for (action, status), count in sorted(self.requests.items()):
+                lines.append(f'action_requests_total{{action="{_escape(action)}",status="{status}"}} {count}')
+
+            lines += [
+                '# HELP action_phase_seconds Latency of each phase of handling action requests.',
+                '# TYPE action_phase_seconds histogram',
+            ]
+            for (action, phase), histogram in sorted(self.latency.items()):
+                lines += _histogram_lines('action_phase_seconds', f'action="{_escape(action)}",phase="{phase}"', histogram)
+
+            lines += [
+                '# HELP action_response_bytes Size of action response content, streaming responses excluded.',
+                '# TYPE action_response_bytes histogram',
+            ]
+            for action, histogram in sorted(self.sizes.items()):
+                lines += _histogram_lines('action_response_bytes', f'action="{_escape(action)}"', histogram)
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram_lines(name, labels, histogram):
+    for le, count in histogram.samples():
+        yield f'{name}_bucket{{{labels},le="{le}"}} {count}'
+    yield f'{name}_sum{{{labels}}} {histogram.sum}'
+    yield f'{name}_count{{{labels}}} {histogram.count}'
+
+
+# Metrics of this process.
+action_metrics = ActionMetrics()
+
+
+class PhaseTimer(object):
+    """
+    To time phases of handling one action request, used by `APIIngressBase`.
+    """
+    def __init__(self):
+        self.action = UNKNOWN_ACTION
+        self.phases = {}
+        self.last = time.perf_counter()
+        self.start = time.monotonic()  # When the request arrived, as the start of its deadline.
+
+    def lap(self, phase):
+        """
+        To add time passed since last lap to `phase`.
+        """
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0) + now - self.last
+        self.last = now
+
+    def split(self, handler):
+        """
+        Validating runs inside the action, to move its time from 'handler' phase to 'validate' phase.
+        """
+        validate = handler.timings.get('validate', 0)
+        if validate and 'handler' in self.phases:
+            self.phases['handler'] -= validate
+            self.phases['validate'] = self.phases.get('validate', 0) + validate
+
+    def finish(self, response):
+        """
+        To record metrics of this request with its `response`.
+        """
+        if not ACTION_METRICS_ENABLED:
+            return response
+        size = None if response.streaming else len(response.content)
+        action_metrics.observe(self.action, response.status_code, self.phases, size)
+        return response
+
+    def fail(self):
+        """
+        To record metrics of this request failed by an uncaught exception, as status 500 with phases timed so far.
+        """
+        if ACTION_METRICS_ENABLED:
+            action_metrics.observe(self.action, 500, self.phases)
+
+
+class ActionMetricsView(View):
+    """
+    To expose action metrics of this process in Prometheus text format. Mount it next to API ingress urls, e.g.:
+
+        path('api/metrics', ActionMetricsView.as_view()),
+
+    Note: Metrics are collected per process. Under multi-process servers, each scrape gets metrics of one process.
+    """
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(action_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,4 +1,5 @@
 from django.db.models import ManyToManyField
+from corelib.api_base.action_cache import invalidate_model_cache
 
 
 class AddDataMixin(object):
@@ -28,6 +29,7 @@ class AddDataMixin(object):
         # Then, to set m2m fields.
         for f in m2m_fields:
             getattr(obj, f).set(m2m_fields[f])
+        invalidate_model_cache(model)
 
         self.message = f"To add data succeeded." if success_msg is None else success_msg
         return obj
@@ -1,3 +1,7 @@
+from corelib.api_base.action_cache import invalidate_model_cache
+from corelib.api_base.delta_sync import record_tombstones
+
+
 class DeleteDataMixin(object):
     """
     作为核心功能的扩展，必须和核心类`APIHandlerBase`一起使用。
@@ -5,10 +9,13 @@ class DeleteDataMixin(object):
 
     def deleteData(self, identifier='id', success_msg=None, error_msg=None):
         obj = self.checked_params[identifier]
+        pk = obj.pk
         try:
             obj.delete()
         except Exception as e:
             _msg = f"Failed to delete data with '{identifier}={self.params[identifier]}'. {str(e)}" if error_msg is None else error_msg
             return self.error(_msg)
+        invalidate_model_cache(type(obj))
+        record_tombstones(type(obj), [pk])
 
         self.message = f"To delete data succeeded." if success_msg is None else success_msg
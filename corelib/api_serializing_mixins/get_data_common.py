@@ -1,4 +1,5 @@
 from datetime import datetime, date, time
+from django.core.exceptions import FieldDoesNotExist
 from django.db.models import ForeignKey, ManyToManyField, OneToOneField, Model
 
 
@@ -35,6 +36,34 @@ class BaseSerializingMixin(object):
             value = value.strftime(self.time_format)
         return value
 
+    def getRelatedModels(self, model, fields):
+        """
+        获取按fields序列化model时，经关系型字段读取的下级model（递归），记录到`self.read_models`，用于结果缓存失效；
+        未明确指定下级属性的ForeignKey, OneToOneField字段，仅返回本表中的id，不包含在内；
+        ManyToManyField字段，包含其中间表model。
+        """
+        related = set()
+        for field in fields:
+            if isinstance(field, dict):
+                _tmp = [(k, v) for k, v in field.items() if k not in {'__exclude__', '__filter__'}]
+                if len(_tmp) != 1:
+                    continue  # 序列化时由`getObjAttr`报错
+                field_name, sub_fields = _tmp[0]
+            else:
+                field_name, sub_fields = field, None
+            try:
+                model_field = model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                continue  # property等非字段属性
+            if not isinstance(model_field, (ForeignKey, OneToOneField, ManyToManyField)):
+                continue
+            if isinstance(model_field, ManyToManyField):
+                related.add(model_field.remote_field.through)
+            if sub_fields is not None:
+                related.add(model_field.related_model)
+                related |= self.getRelatedModels(model_field.related_model, sub_fields)
+        return related
+
     def getObjAttr(self, obj, field):
         """
         获取字段值;
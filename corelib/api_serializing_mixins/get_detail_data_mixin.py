@@ -19,6 +19,7 @@ class DetailDataMixin(BaseSerializingMixin):
 
     def getDetail(self, model, identifier='id', obj=None, excluded_fields=None):
         obj = self.checked_params[identifier] if obj is None else obj
+        self.read_models.add(model._meta.label)
         self.data = {}
         detail_fields = getattr(model, 'detail_fields', None)
         if detail_fields is None:
@@ -26,6 +27,7 @@ class DetailDataMixin(BaseSerializingMixin):
 
         if isinstance(excluded_fields, list):
             detail_fields = [f for f in detail_fields if f not in excluded_fields]
+        self.read_models.update(m._meta.label for m in self.getRelatedModels(model, detail_fields))
         for field in detail_fields:
             k, v = self.getObjAttr(obj, field)
             self.data[k] = v
@@ -1,6 +1,7 @@
 from django.db.models import Q
 from .defaults import DEFAULT_PAGE_LENGTH
 from .get_data_common import BaseSerializingMixin
+from corelib.api_base.delta_sync import get_sync_field, get_changes, CursorError
 
 
 class ListDataMixin(BaseSerializingMixin):
@@ -26,6 +27,29 @@ class ListDataMixin(BaseSerializingMixin):
     3、若不指定'page_length'，默认长度为`DEFAULT_PAGE_LENGTH`
     4、数据总条数存储在`data_total_length`属性中
 
+    列式返回约定：
+    1、需由action显式开启：调用getList时传入`list_format='columnar'`，返回列式数据，
+        取值一般来自action在post_fields中声明、经过校验的字段，如`list_format=self.checked_params.get('format')`：
+        `{"columns": ["id", "name", ...], "rows": [[1, "a", ...], ...], "dicts": {...}}`，每行按columns的顺序排列值，不再重复字段名
+    2、重复较多的字符串列（不同值的个数不超过行数的一半）做字典编码：其不同的值按列名放在`dicts`中，行中只保存值的下标，
+        如`"dicts": {"result": ["SUCCESS", "FAILED"]}`时，行中的`1`表示"FAILED"；值为None时仍为null
+    3、流式返回时不支持列式返回
+
+    增量同步约定：
+    1、model中以`sync_field`属性指定变更跟踪字段，如`update_at = models.DateTimeField(auto_now=True, db_index=True)`，
+        以`QuerySet.update()`或`save(update_fields=...)`修改数据时，需要用`delta_sync.touch`带上此字段
+    2、需由action以`pre_handler(sync_cursor='since')`显式开启，并在post_fields中声明此字段、列入req/opt，
+        请求数据中带有此字段时，返回此游标之后新增、修改的数据，以及删除的数据id：
+        `{"changed": [...], "deleted": [id, ...], "cursor": "...", "has_more": false, "reset": false}`
+    3、首次同步时'since'为空字符串，之后每次使用上次返回的'cursor'；'has_more'为true时，表示还有更多变更，应立即再次同步
+    4、'reset'为true时，表示游标太旧，已无法得到删除的数据，此时返回的是从头开始的全部数据，客户端应清空本地数据
+    5、增量同步时不分页，search、filter对变更的数据仍然有效，但删除的数据id不受其影响
+
+    流式返回约定：
+    1、设置`stream_list_data = True`，或调用getList时传入`stream=True`，开启流式返回
+    2、开启后，`self.data`为一个生成器，逐行查询、序列化数据，由`APIIngressBase`以StreamingHttpResponse逐行编码返回
+    3、适用于数据量极大的导出类列表，内存占用不随数据量增长
+
     搜索约定：
     1、post数据中包含'search'字段时，调用getList，会触发多字段模糊搜索比配，具体哪些字段，请在model中定义'search_fields'
     2、post数据中包含model定义的db字段，会触发，精确的filter过滤，具体哪些字段，请在model中定义'filter_fields'
@@ -37,6 +61,15 @@ class ListDataMixin(BaseSerializingMixin):
     # 默认开启分页功能
     auto_pagination = True
 
+    # 默认不开启流式返回
+    stream_list_data = False
+
+    # 流式返回时，每次从DB读取的数据行数
+    stream_chunk_rows = 500
+
+    # 增量同步游标的post字段，由`apiIngress`按`pre_handler(sync_cursor=...)`设置，None表示不支持增量同步
+    sync_cursor_field = None
+
     # 数据总长度，分页功能使用
     data_total_length = None
 
@@ -110,30 +143,97 @@ class ListDataMixin(BaseSerializingMixin):
                 tmp_set.add(raw['id'])
         return data
 
-    def makeListData(self, queryset, model):
+    def getListFields(self, model):
         """
-        将queryset基于model.list_fields设置，转换成可序列化的数据列表;
-        不管model.list_fields有没有指定id，都会返回id属性；
-        另外，基于ManyToManyField的下级属性做过滤，会造成数据重复，在这里会保证每条数据id不重复。
+        获取model.list_fields设置，不管有没有指定id，都会包含id属性
         """
         list_fields = getattr(model, 'list_fields', None)
         if list_fields is None:
             list_fields = [f.name for f in model._meta.get_fields()]
         if 'id' not in list_fields:
-            list_fields.append('id')
-
-        list_data = []
-        for obj in queryset:
-            raw = {}
-            for field in list_fields:
-                k, v = self.getObjAttr(obj, field)
-                raw[k] = v
-            list_data.append(raw)
-        return list_data
-
-    def getList(self, model, spec_qs=None, order_by=None, excludes=None, additional_filters=None):
+            list_fields = list(list_fields) + ['id']
+        return list_fields
+
+    def makeRowData(self, obj, list_fields):
+        raw = {}
+        for field in list_fields:
+            k, v = self.getObjAttr(obj, field)
+            raw[k] = v
+        return raw
+
+    def makeListData(self, queryset, model):
+        """
+        将queryset基于model.list_fields设置，转换成可序列化的数据列表;
+        不管model.list_fields有没有指定id，都会返回id属性；
+        另外，基于ManyToManyField的下级属性做过滤，会造成数据重复，在这里会保证每条数据id不重复。
+        """
+        list_fields = self.getListFields(model)
+        return [self.makeRowData(obj, list_fields) for obj in queryset]
+
+    def getFieldName(self, field):
+        """
+        获取list_fields中一个字段设置对应的数据字段名
+        """
+        if isinstance(field, dict):
+            return next(k for k in field if k not in {'__exclude__', '__filter__'})
+        return field
+
+    def makeColumnarData(self, queryset, model):
+        """
+        与makeListData相同，但返回列式数据，并对重复较多的字符串列做字典编码，见“列式返回约定”
+        """
+        list_fields = self.getListFields(model)
+        rows = [[self.getObjAttr(obj, field)[1] for field in list_fields] for obj in queryset]
+        dicts = {}
+        for i, field in enumerate(list_fields):
+            # 收集字符串列的不同值及其下标，遇到非字符串的值则不编码此列
+            values = {}
+            for row in rows:
+                value = row[i]
+                if value is not None:
+                    if not isinstance(value, str):
+                        break
+                    values.setdefault(value, len(values))
+            else:
+                if values and len(values) * 2 <= len(rows):
+                    for row in rows:
+                        if row[i] is not None:
+                            row[i] = values[row[i]]
+                    dicts[self.getFieldName(field)] = list(values)
+        return {'columns': [self.getFieldName(field) for field in list_fields], 'rows': rows, 'dicts': dicts}
+
+    def getChanges(self, queryset, model, cursor, list_format='rows'):
+        """
+        增量同步：返回游标之后新增、修改的数据，以及删除的数据id，见“增量同步约定”
+        """
+        if get_sync_field(model) is None:
+            return self.error(f"ERROR: '{model.__name__}' does not support delta sync, `sync_field` is not set.")
+        try:
+            rows, deleted, cursor, has_more, reset = get_changes(queryset, model, str(cursor))
+        except CursorError as e:
+            return self.error(str(e))
+        changed = self.makeColumnarData(rows, model) if list_format == 'columnar' else self.makeListData(rows, model)
+        self.data = {'changed': changed, 'deleted': deleted, 'cursor': cursor, 'has_more': has_more, 'reset': reset}
+        return self.data
+
+    def iterListData(self, queryset, model):
+        """
+        与makeListData相同，但返回一个生成器，以`queryset.iterator()`逐批读取DB数据、逐行序列化。
+        """
+        list_fields = self.getListFields(model)
+        for obj in queryset.iterator(chunk_size=self.stream_chunk_rows):
+            yield self.makeRowData(obj, list_fields)
+
+    def getList(self, model, spec_qs=None, order_by=None, excludes=None, additional_filters=None, stream=None, list_format=None):
+        """
+        stream: 是否流式返回，None表示按`self.stream_list_data`设置。
+        list_format: 列表数据格式，'rows'（字典列表）或'columnar'（列式），None表示'rows'，见“列式返回约定”。
+        """
         if self.checked_params is None:
             self.checked_params = {}
+        list_format = list_format or 'rows'
+        if list_format not in ('rows', 'columnar'):
+            return self.error(f"ERROR: Illegal list format '{list_format}', it must be 'rows' or 'columnar'.")
         search = {
             'search_value': self.checked_params.get('search'),
             'search_fields': list(getattr(model, 'search_fields', [])),
@@ -143,13 +243,25 @@ class ListDataMixin(BaseSerializingMixin):
             'additional_filters': additional_filters,
             'spec_qs': spec_qs,
         }
+        self.read_models.add(model._meta.label)
+        self.read_models.update(m._meta.label for m in self.getRelatedModels(model, self.getListFields(model)))
         queryset = self.getQueryset(model, **search)
+        since = self.checked_params.get(self.sync_cursor_field) if self.sync_cursor_field is not None else None
+        if since is not None:
+            return self.getChanges(queryset, model, since, list_format)
+        stream = self.stream_list_data if stream is None else stream
         if not queryset.exists():
-            self.data = []
+            self.data = self.makeColumnarData([], model) if list_format == 'columnar' and not stream else []
         else:
             if self.auto_pagination and "page_index" not in self.checked_params:
                 self.checked_params['page_index'] = 1
             if "page_index" in self.checked_params:
                 queryset = self.pagination(queryset)
-            self.data = self.makeListData(queryset, model)
+            if stream:
+                # 流式返回时数据在action结束后才读取，这里先固定当前路由到的数据库（如只读副本）
+                self.data = self.iterListData(queryset.using(queryset.db), model)
+            elif list_format == 'columnar':
+                self.data = self.makeColumnarData(queryset, model)
+            else:
+                self.data = self.makeListData(queryset, model)
         return self.data
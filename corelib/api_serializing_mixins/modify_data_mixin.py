@@ -1,4 +1,6 @@
 from django.db.models import ManyToManyField
+from corelib.api_base.action_cache import invalidate_model_cache
+from corelib.api_base.delta_sync import touch
 
 
 class ModifyDataMixin(object):
@@ -19,10 +21,11 @@ class ModifyDataMixin(object):
             changed = True
         if changed:
             try:
-                obj.save(update_fields=update_fields)
+                obj.save(update_fields=touch(type(obj), update_fields=update_fields) if update_fields else None)
             except Exception as e:
                 _msg = f"Failed to modify data with '{identifier}={self.params[identifier]}'. {str(e)}" if error_msg is None else error_msg
                 return self.error(_msg, return_value=False)
+            invalidate_model_cache(type(obj))
 
         self.message = f"To modify data with '{identifier}={self.params[identifier]}' succeeded." if success_msg is None else success_msg
         return changed
@@ -33,9 +36,11 @@ class ModifyDataMixin(object):
         返回匹配到的更新行数，Int型。
         """
         try:
-            rows = model.objects.filter(**filters).update(**values)
+            rows = model.objects.filter(**filters).update(**touch(model, values))
         except Exception as e:
             return self.error(f"ERROR: Failed to execute SQL update. {str(e)}")
 
+        if rows:
+            invalidate_model_cache(model)
         self.message = f"{rows} row updated."
         return rows
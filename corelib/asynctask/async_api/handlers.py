@@ -1,39 +1,44 @@
 from corelib import APIHandlerBase, pre_handler, IntType, StrType, ChoiceType, ObjectType
+from corelib.api_serializing_mixins.get_list_data_mixin import ListDataMixin
 from .models import AsyncTask
-from corelib.asynctask.config import ASYNC_TASK_LOGDIR, ASYNC_TASK_LOGFILE_PREFIX
+from corelib.asynctask.lib.defaults import ASYNCTASK_LOGDIR, ASYNCTASK_LOGFILE_PREFIX
+from corelib.api_base.delta_sync import record_tombstones
 import os
 
 
-class AsyncTaskListAPI(APIHandlerBase):
-    fields_defination = {
+class AsyncTaskListAPI(APIHandlerBase, ListDataMixin):
+    post_fields = {
         'search': StrType(name='search'),
         'status': ChoiceType(*[item[0] for item in AsyncTask.STATUS_OPTIONS], allow_empty=True, name='status'),
-        'result': ChoiceType(*[item[0] for item in AsyncTask.RESULT_OPTIONS], allow_empty=True, name='result'),
-        'offset': IntType(min=1, name='offset'),
-        'limit': IntType(min=0, name='limit'),
+        'result': ChoiceType(True, False, allow_empty=True, name='result'),
+        'page_index': IntType(min=1, name='page_index'),
+        'page_length': IntType(min=0, name='page_length'),
         'id': ObjectType(AsyncTask, name='id')
     }
 
-    @pre_handler(opt=["search", "status", "result", "offset", "limit"])
+    @pre_handler(opt=["search", "status", "result", "page_index", "page_length"], readonly=True, etag=True, coalesce=True)
     def getList(self):
-        self.baseGetList(model=AsyncTask)
+        # action名与`ListDataMixin.getList`同名，需显式调用
+        ListDataMixin.getList(self, model=AsyncTask)
 
     @pre_handler(req=["id"])
     def delete(self):
         obj = self.checked_params['id']
         id, name = obj.id, obj.name
         obj.delete()
+        record_tombstones(AsyncTask, [id])
         self.message = f"To delete async task with id='{id}', name='{name}' succeeded."
 
 
 class AsyncTaskLogAPI(APIHandlerBase):
-    fields_defination = {
+    post_fields = {
         'id': ObjectType(AsyncTask, real_query=False, name='id')
     }
-    @pre_handler(req=["id"])
+
+    @pre_handler(req=["id"], readonly=True)
     def getLog(self):
         id = self.checked_params['id']
-        log_file = os.path.join(ASYNC_TASK_LOGDIR, f'{ASYNC_TASK_LOGFILE_PREFIX}_{id}.log')
+        log_file = os.path.join(ASYNCTASK_LOGDIR, f'{ASYNCTASK_LOGFILE_PREFIX}_{id}.log')
         self.data = [f'ERROR: Missing log file: {log_file}']
         if os.path.isfile(log_file):
             with open(log_file) as f:
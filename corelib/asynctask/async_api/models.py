@@ -17,9 +17,11 @@ class AsyncTask(models.Model):
     result_data = JSONField("执行返回数据", default={})
     create_time = models.DateTimeField("创建时间", auto_now_add=True)
     finish_time = models.DateTimeField("完成时间", null=True)
+    update_time = models.DateTimeField("更新时间", auto_now=True, db_index=True)
 
     # serializing settings.
     list_fields = ["id", "uuid", "name", "status", "result", "result_data", "create_time", "finish_time"]
     detail_fields = list_fields
     search_fields = ["uuid", "name"]
     filter_fields = ["status", "result"]
+    sync_field = "update_time"
@@ -6,6 +6,8 @@ _ASYNCTASK_BIND_PORT = 11118  # listen port
 _ASYNCTASK_WORKERS = 0  # 0 means auto fetch the number from OS CPU cores.
 _ASYNCTASK_REGISTER_MODULE = 'asynctasks'  # This means you should write all async task functions in 'asynctasks.py' in django app's basedir.
 _ASYNCTASK_LOG_LEVEL = 'INFO'
+_ASYNCTASK_LOGDIR = '/tmp'  # dir of log files of async tasks, read by action 'getLog'.
+_ASYNCTASK_LOGFILE_PREFIX = 'asynctask'  # log file of a task is '<prefix>_<task id>.log'.
 
 # To user value in settings, or default value.
 ASYNCTASK_BIND_ADDR = getattr(settings, 'ASYNCTASK_BIND_ADDR', _ASYNCTASK_BIND_ADDR)
@@ -15,3 +17,5 @@ ASYNCTASK_CLIENT_CONNECT_PORT = getattr(settings, 'ASYNCTASK_CLIENT_CONNECT_PORT
 ASYNCTASK_WORKERS = getattr(settings, 'ASYNCTASK_WORKERS', _ASYNCTASK_WORKERS)
 ASYNCTASK_REGISTER_MODULE = getattr(settings, 'ASYNCTASK_REGISTER_MODULE', _ASYNCTASK_REGISTER_MODULE)
 ASYNCTASK_LOG_LEVEL = getattr(settings, 'ASYNCTASK_LOG_LEVEL', _ASYNCTASK_LOG_LEVEL)
+ASYNCTASK_LOGDIR = getattr(settings, 'ASYNCTASK_LOGDIR', _ASYNCTASK_LOGDIR)
+ASYNCTASK_LOGFILE_PREFIX = getattr(settings, 'ASYNCTASK_LOGFILE_PREFIX', _ASYNCTASK_LOGFILE_PREFIX)
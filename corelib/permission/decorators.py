@@ -1,4 +1,6 @@
 from functools import wraps
+from inspect import iscoroutinefunction
+from asgiref.sync import sync_to_async
 from .defaults import (
     PERMISSION_GROUPS, CUSTOM_PERMISSION_MODEL, DEFAULT_USER_WHEN_AUTH_NOT_REQUIRED,
     DEFAULT_PERM_WHEN_AUTH_NOT_REQUIRED, DEFAULT_USER_PASSWORD)
@@ -18,8 +20,10 @@ def permissionChecker(perm=None):
         perm    A string define in `PERMISSION_GROUPS` setting.
     """
     def decorator(func):
-        @wraps(func)
-        def checker(self, *args, **kwargs):
+        def check(self):
+            """
+            Returns True if passed.
+            """
             if perm is not None and not self.by_pass_perm_check:
                 # To get permission model.
                 model = get_model()
@@ -39,10 +43,10 @@ def permissionChecker(perm=None):
                     perm_defaults = {
                         'perm_group': DEFAULT_PERM_WHEN_AUTH_NOT_REQUIRED,
                     }
-                    user_perm, _ = model.objects.get_or_create(user=user, defaults=perm_defaults)
+                    user_perm, _ = model.objects.select_related('user').get_or_create(user=user, defaults=perm_defaults)
                 else:
                     # Online mode.
-                    user_perm = model.objects.filter(user=self.request.user).first()
+                    user_perm = model.objects.filter(user=self.request.user).select_related('user').first()
                 if user_perm is None:
                     return self.error(f"{error_msg} User_perm: None!", http_status=403)
 
@@ -50,6 +54,20 @@ def permissionChecker(perm=None):
                 self.user_perm = user_perm
                 if PERMISSION_GROUPS[user_perm.perm_group] < PERMISSION_GROUPS[perm]:
                     return self.error(error_msg, http_status=403)
+            return True
+
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_checker(self, *args, **kwargs):
+                if not await sync_to_async(check)(self):
+                    return None
+                return await func(self, *args, **kwargs)
+            return async_checker
+
+        @wraps(func)
+        def checker(self, *args, **kwargs):
+            if not check(self):
+                return None
 
             # To do action.
             func_result = func(self, *args, **kwargs)
@@ -8,26 +8,26 @@ from .tools import get_model
 
 class PermissionGet(APIHandlerBase, ListDataMixin, DetailDataMixin):
     post_fields = {
-        "id": ObjectType(get_model()),
+        "id": ObjectType(get_model(), select_related=["user"]),
         "search": StrType(),
         "perm_group": ChoiceType(*PERMISSION_GROUPS.keys(), allow_empty=True),
         "page_index": IntType(min=1),
         "page_length": IntType(min=0),
     }
 
-    @pre_handler(opt=["search", "perm_group", "page_index", "page_length"], perm='admin')
+    @pre_handler(opt=["search", "perm_group", "page_index", "page_length"], perm='admin', readonly=True)
     def getUserList(self):
         self.getList(model=get_model())
 
-    @pre_handler(req=['id'], perm='admin')
+    @pre_handler(req=['id'], perm='admin', readonly=True)
     def getUserDetail(self):
         self.getDetail(model=get_model())
 
-    @pre_handler(perm='admin')
+    @pre_handler(perm='admin', readonly=True)
     def getPermGroups(self):
         self.data = list(PERMISSION_GROUPS.keys())
 
-    @pre_handler(perm='normal')
+    @pre_handler(perm='normal', readonly=True)
     def getMyPerm(self):
         self.data = {"perm_group": self.user_perm.perm_group, "username": self.user_perm.user.username}
 
@@ -1,4 +1,6 @@
 from functools import wraps
+from inspect import iscoroutinefunction
+from asgiref.sync import sync_to_async
 from django.utils import timezone
 
 
@@ -9,8 +11,7 @@ def recorder(record_label=None):
     This decorator needs 'corelib.recorder' to be installed as a django app.
     """
     def decorator(func):
-        @wraps(func)
-        def recording(self, *args, **kwargs):
+        def start(self):
             from corelib.recorder.models import APICallingRecord
             # To record this call.
             username = ''
@@ -29,11 +30,9 @@ def recorder(record_label=None):
                 "action_label": record_label if record_label else '',
                 "post_data": self.params
             }
-            record = APICallingRecord.objects.create(**record_data)
-
-            # To do the real work.
-            func_result = func(self, *args, **kwargs)
+            return APICallingRecord.objects.create(**record_data)
 
+        def finish(self, record):
             # To record result of this call after doing real work.
             record.result = "SUCCESS" if self.result else "FAILED"
             record.message = self.message
@@ -41,6 +40,23 @@ def recorder(record_label=None):
             record.finish_time = timezone.now()
             record.save()
 
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_recording(self, *args, **kwargs):
+                record = await sync_to_async(start)(self)
+                func_result = await func(self, *args, **kwargs)
+                await sync_to_async(finish)(self, record)
+                return func_result
+            return async_recording
+
+        @wraps(func)
+        def recording(self, *args, **kwargs):
+            record = start(self)
+
+            # To do the real work.
+            func_result = func(self, *args, **kwargs)
+
+            finish(self, record)
             return func_result
         return recording
     return decorator
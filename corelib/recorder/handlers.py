@@ -9,8 +9,9 @@ class APICallingRecordHandler(APIHandlerBase, ListDataMixin):
         "result": ChoiceType("SUCCESS", "FAILED"),
         'page_index': IntType(min=1),
         'page_length': IntType(min=0),
+        'format': ChoiceType("rows", "columnar", allow_empty=True),
     }
 
-    @pre_handler(opt=["search", "result", "page_index", "page_length"], perm="admin")
+    @pre_handler(opt=["search", "result", "page_index", "page_length", "format"], perm="admin", readonly=True, max_concurrency=4, queue_timeout=1)
     def getRecordList(self):
-        self.getList(model=APICallingRecord)
+        self.getList(model=APICallingRecord, list_format=self.checked_params.get('format'))
@@ -15,12 +15,14 @@ class APICallingRecord(models.Model):
     message = models.TextField("成功消息", default="")
     error_message = models.TextField("失败消息", default="")
     operating_time = models.DateTimeField("操作时间", default=timezone.now)
+    update_time = models.DateTimeField("更新时间", auto_now=True, db_index=True)
 
     # serializing field.s
     list_fields = ["id", "username", "api", "action", "action_label", "post_data", "result", "message", "error_message", "operating_time"]
     detail_fields = list_fields
     search_fields = ["username", "api", "action", "action_label", "post_data", "message", "error_message"]
     filter_fields = ["result"]
+    sync_field = "update_time"
 
     class Meta:
         ordering = ['-id']
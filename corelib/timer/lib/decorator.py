@@ -61,7 +61,7 @@ def cron(every=None, crontab=None, enabled=True, dynamic=False):
                     'last_run_result': result,
                     'total_run_count': self.dynamic_tasks[name]['total_run_count']
                 }
-                CronJob.objects.filter(name=name).update(**_attrs)
+                CronJob.objects.filter(name=name).update(update_at=timezone.now(), **_attrs)
                 self.logger.log(f'dynamic task result updated: {_attrs}', level='DEBUG')
             self.logger.log(f"Task '{name}' finished. time_spend: {time_spend}s, result: {result}")
 
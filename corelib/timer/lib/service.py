@@ -163,6 +163,11 @@ class Timer(object):
 
                         self.logger.log(f"To register {_type} task '{index}' succeeded.")
 
+        # 动态任务注册后，使可用任务列表接口的缓存失效
+        if self.enable_dynamic:
+            from corelib.api_base.action_cache import invalidate_model_cache
+            invalidate_model_cache(AvailableTasks)
+
     def update_dynamic_tasks(self):
         """
         读取数据库配置，更新全局属性`dynamic_tasks`与`dynamic_state`
@@ -210,20 +215,20 @@ class Timer(object):
         at_time = self.dynamic_tasks[name]['at_time']
 
         if expired_time and expired_time <= timezone.now():
-            CronJob.objects.filter(name=name).update(enabled=0)
+            CronJob.objects.filter(name=name).update(enabled=0, update_at=timezone.now())
             self.logger.log(f"Dynamic task '{name}' has expired!")
             return True
         if expired_count and total_run_count >= expired_count:
-            CronJob.objects.filter(name=name).update(enabled=0)
+            CronJob.objects.filter(name=name).update(enabled=0, update_at=timezone.now())
             self.logger.log(f"Dynamic task '{name}' has expired, according to count limit '{expired_count}'!")
             return True
         if not (every or crontab):
             if not at_time:
-                CronJob.objects.filter(name=name).update(enabled=0)
+                CronJob.objects.filter(name=name).update(enabled=0, update_at=timezone.now())
                 self.logger.log(f"Task '{name}' with no running way set is now be disabled!")
                 return True
             if total_run_count >= 1:
-                CronJob.objects.filter(name=name).update(enabled=0)
+                CronJob.objects.filter(name=name).update(enabled=0, update_at=timezone.now())
                 self.logger.log(f"At time task '{name}' finished and will not run any more!")
                 return True
         return False
@@ -12,11 +12,11 @@ class CronjobReadHandler(APIHandlerBase, ListDataMixin, DetailDataMixin):
         'id': ObjectType(model=CronJob),
     }
 
-    @pre_handler(opt=['search', 'enabled', 'last_run_result'])
+    @pre_handler(opt=['search', 'enabled', 'last_run_result'], readonly=True, etag=True, coalesce=True)
     def getCronList(self):
         self.getList(model=CronJob)
 
-    @pre_handler(req=['id'])
+    @pre_handler(req=['id'], readonly=True)
     def getCronDetail(self):
         self.getDetail(model=CronJob)
 
@@ -74,14 +74,14 @@ class CronjobWriteHandler(APIHandlerBase, AddDataMixin, DeleteDataMixin, ModifyD
     def enableCron(self):
         obj = self.checked_params['id']
         obj.enabled = 1
-        obj.save(update_fields=['enabled'])
+        obj.save(update_fields=['enabled', 'update_at'])
         self.message = 'To enable cron task succeeded.'
 
     @pre_handler(req=['id'], perm='admin')
     def disableCron(self):
         obj = self.checked_params['id']
         obj.enabled = 0
-        obj.save(update_fields=['enabled'])
+        obj.save(update_fields=['enabled', 'update_at'])
         self.message = 'To disable cron task succeeded.'
 
     @pre_handler(req=['id'], opt=['at_time'], perm='admin')
@@ -93,7 +93,7 @@ class CronjobWriteHandler(APIHandlerBase, AddDataMixin, DeleteDataMixin, ModifyD
         obj.last_run_result = ''
         if self.checked_params.get('at_time'):
             obj.at_time = self.checked_params['at_time']
-        obj.save(update_fields=['total_run_count', 'last_run_start_at', 'last_run_spend_time', 'last_run_result', 'at_time'])
+        obj.save(update_fields=['total_run_count', 'last_run_start_at', 'last_run_spend_time', 'last_run_result', 'at_time', 'update_at'])
 
 
 class AvailableTasksHandler(APIHandlerBase, ListDataMixin, AddDataMixin):
@@ -101,6 +101,6 @@ class AvailableTasksHandler(APIHandlerBase, ListDataMixin, AddDataMixin):
         'search': StrType()
     }
 
-    @pre_handler(opt=['search'])
+    @pre_handler(opt=['search'], readonly=True)
     def getAvailableCronList(self):
         self.getList(model=AvailableTasks)
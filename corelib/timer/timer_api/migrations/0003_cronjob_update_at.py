@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timer_api', '0002_availabletasks_cronjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cronjob',
+            name='update_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='任务更新时间'),
+        ),
+    ]
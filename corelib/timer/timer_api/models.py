@@ -45,10 +45,12 @@ class CronJob(models.Model):
     last_run_result = models.CharField('最后一次执行结果', max_length=16, choices=tuple(TASK_RESULT_CHOICES.items()), default='')
     total_run_count = models.IntegerField('总共执行次数', default=0)
     create_at = models.DateTimeField('任务创建时间', default=timezone.now)
+    update_at = models.DateTimeField('任务更新时间', auto_now=True, db_index=True)
 
     # serializing fields.
     search_fields = ['name', 'description', 'task', 'args', 'kwargs', 'crontab']
     filter_fields = ['enabled', 'last_run_result']
+    sync_field = 'update_at'
 
     class Meta:
         ordering = ['-id']
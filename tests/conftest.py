@@ -0,0 +1,27 @@
+"""
+Minimal django setup to run tests from the repo root by `python -m pytest tests`, with an in-memory sqlite DB.
+"""
+import os
+import sys
+
+import django
+from django.conf import settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def pytest_configure(config):
+    from django.core.management import call_command
+
+    settings.configure(
+        SECRET_KEY='tests',
+        INSTALLED_APPS=['django.contrib.auth', 'django.contrib.contenttypes', 'django.contrib.sessions',
+                        'corelib.permission', 'corelib.recorder'],
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+        USE_TZ=False,
+        DEFAULT_AUTO_FIELD='django.db.models.AutoField',
+    )
+    django.setup()
+    call_command('migrate', run_syncdb=True, verbosity=0)
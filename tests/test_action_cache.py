@@ -0,0 +1,58 @@
+import tempfile
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from corelib import APIHandlerBase, APIIngressBase, pre_handler
+from corelib.api_serializing_mixins.get_list_data_mixin import ListDataMixin
+from corelib.api_serializing_mixins.get_detail_data_mixin import DetailDataMixin
+from corelib.permission.models import APIPermission
+
+
+class CachedHandler(APIHandlerBase):
+    @pre_handler(readonly=True, cache=60)
+    def getCached(self):
+        self.data = 1
+
+
+class PermHandler(APIHandlerBase, ListDataMixin, DetailDataMixin):
+    pass
+
+
+class SharedCacheTest(TestCase):
+    """
+    Model versions of cached results are kept in `ACTION_CACHE_ALIAS`, which must be shared by all processes.
+    """
+    def define_ingress(self):
+        return type('Ingress', (APIIngressBase,), {'actions': {'getCached': CachedHandler}})
+
+    def test_local_cache_rejected(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            with self.assertRaises(ImproperlyConfigured):
+                self.define_ingress()
+
+    def test_shared_cache_accepted(self):
+        with tempfile.TemporaryDirectory() as location:
+            with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}}):
+                self.assertIn('getCached', self.define_ingress()._dispatch)
+
+
+class ReadModelsTest(TestCase):
+    """
+    Models read through relations declared in `list_fields`/`detail_fields` invalidate cached results too.
+    """
+    def setUp(self):
+        user = User.objects.create(username='u1')
+        self.perm = APIPermission.objects.create(user=user, perm_group='admin')
+
+    def test_list(self):
+        handler = PermHandler()
+        handler.getList(model=APIPermission)
+        self.assertEqual(handler.read_models, {'permission.APIPermission', 'auth.User'})
+
+    def test_detail(self):
+        handler = PermHandler()
+        handler.getDetail(model=APIPermission, obj=self.perm)
+        self.assertEqual(handler.read_models, {'permission.APIPermission', 'auth.User'})
+
+    def test_id_only_relation(self):
+        self.assertEqual(PermHandler().getRelatedModels(APIPermission, ['id', 'user']), set())
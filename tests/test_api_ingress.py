@@ -0,0 +1,117 @@
+import json
+import msgpack
+from asgiref.sync import async_to_sync
+from django.utils.asyncio import async_unsafe
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase
+from corelib import APIHandlerBase, APIIngressBase, AsyncAPIIngressBase, pre_handler, ListType, StrType
+from corelib.api_base.metrics import action_metrics
+
+
+class BulkHandler(APIHandlerBase):
+    post_fields = {
+        'items': ListType(StrType()),
+        'name': StrType(),
+    }
+
+    @pre_handler(opt=['items', 'name'], stream_list='items')
+    def bulk(self):
+        self.data = {'items': self.checked_params.get('items'), 'name': self.checked_params.get('name')}
+
+
+@async_unsafe
+def read_row(i):
+    """ Like a DB query, not allowed in the event loop. """
+    return {'id': i}
+
+
+class RowsHandler(APIHandlerBase):
+    @pre_handler(readonly=True)
+    def streamRows(self):
+        self.data = (read_row(i) for i in range(3))
+
+
+class FailingHandler(APIHandlerBase):
+    @pre_handler(readonly=True)
+    def getFailed(self):
+        raise RuntimeError('Failed.')
+
+
+ACTIONS = {'bulk': BulkHandler, 'streamRows': RowsHandler, 'getFailed': FailingHandler}
+
+
+class Ingress(APIIngressBase):
+    actions = ACTIONS
+
+
+class AsyncIngress(AsyncAPIIngressBase):
+    actions = ACTIONS
+
+
+def post(path, data, **extra):
+    request = RequestFactory().post(path, data=json.dumps(data), content_type='application/json', **extra)
+    request.user = AnonymousUser()
+    return request
+
+
+class StreamListTest(TestCase):
+    """
+    Bodies of actions with `pre_handler(stream_list=...)`, hinted by `?action=...`, are loaded incrementally.
+    """
+    def call(self, data):
+        sync_response = Ingress.as_view()(post('/api?action=bulk', data))
+        async_response = async_to_sync(AsyncIngress.as_view())(post('/api?action=bulk', data))
+        return [(response.status_code, json.loads(response.content)) for response in (sync_response, async_response)]
+
+    def test_stream_field_sent(self):
+        for status, content in self.call({'action': 'bulk', 'items': ['a', 'b'], 'name': 'x'}):
+            self.assertEqual(status, 200)
+            self.assertEqual(content['data'], {'items': ['a', 'b'], 'name': 'x'})
+
+    def test_optional_stream_field_missing(self):
+        for status, content in self.call({'action': 'bulk', 'name': 'x'}):
+            self.assertEqual(status, 200)
+            self.assertEqual(content['data'], {'items': None, 'name': 'x'})
+
+
+def read_stream(response):
+    if not response.is_async:
+        return b''.join(response.streaming_content)
+
+    async def read():
+        return b''.join([chunk async for chunk in response.streaming_content])
+    return async_to_sync(read)()
+
+
+class StreamedRowsTest(TestCase):
+    """
+    Streamed rows are rendered by chunks for JSON, and as a list for codecs not streamable, like MessagePack.
+    """
+    def test_json(self):
+        for view in (Ingress.as_view(), async_to_sync(AsyncIngress.as_view())):
+            response = view(post('/api', {'action': 'streamRows'}))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(read_stream(response))['data'], [{'id': 0}, {'id': 1}, {'id': 2}])
+
+    def test_msgpack(self):
+        for view in (Ingress.as_view(), async_to_sync(AsyncIngress.as_view())):
+            response = view(post('/api', {'action': 'streamRows'}, HTTP_ACCEPT='application/msgpack'))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(msgpack.unpackb(response.content)['data'], [{'id': 0}, {'id': 1}, {'id': 2}])
+
+
+class FailedMetricsTest(TestCase):
+    """
+    Requests failed by uncaught exceptions are counted as status 500 in metrics, and the exceptions still raised.
+    """
+    def test_failed(self):
+        action_metrics.reset()
+        get = RequestFactory().get('/api', {'action': 'getFailed'})
+        get.user = AnonymousUser()
+        requests = [post('/api', {'action': 'getFailed'}), get]
+        for view in (Ingress.as_view(), async_to_sync(AsyncIngress.as_view())):
+            for request in requests:
+                with self.assertRaises(RuntimeError):
+                    view(request)
+        self.assertEqual(action_metrics.requests[('getFailed', 500)], 4)
+        self.assertIn(('getFailed', 'parse'), action_metrics.latency)
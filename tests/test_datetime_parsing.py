@@ -0,0 +1,67 @@
+from datetime import datetime
+from unittest import TestCase
+import random
+from corelib import DatetimeType, DateType
+from corelib.api_base.datetime_parsing import get_datetime_parser, get_date_parser
+
+FORMATS = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M', '%Y-%m-%d', '%d/%m/%Y %H:%M',
+           '%Y%m%d%H%M%S', '%H:%M:%S.%f', '%m%d', '%Y-%m-%d %H:%M:%S.%f', '%Y  %m', '100%% %Y', '%b %d %Y']
+CHARS = '0123456789012345678901234567890-: T.t/%٣ '
+
+
+def parse(func, value):
+    """ Returns the parsed value, or 'ValueError' if `func` rejects it. """
+    try:
+        return func(value)
+    except ValueError:
+        return 'ValueError'
+
+
+def mutations(value, rng):
+    """ Values around a legal `value`, most of them illegal: extra spaces, missing or out of range digits, other separators. """
+    return [
+        value, value + ' ', ' ' + value, value.replace('0', '', 1), value.replace('-', '/', 1), value[:-1], value.replace(' ', 't'),
+        value.replace('T', 't'), value.replace(' ', '  '), value[:11] + '24' + value[13:], value[:17] + '60', value[:8] + '31' + value[10:],
+        value[:5] + '02-29' + value[10:], value[:5] + '1' + value[7:], ''.join(rng.choice(CHARS) for _ in range(len(value))),
+    ]
+
+
+class DatetimeParsingTest(TestCase):
+    """
+    Parsers of `datetime_parsing` must accept and reject the same values as `datetime.strptime`, with the same results.
+    """
+    def test_same_as_strptime(self):
+        rng = random.Random(7)
+        for format in FORMATS:
+            datetime_parser, date_parser = get_datetime_parser(format), get_date_parser(format)
+            for _ in range(200):
+                legal = datetime(rng.randint(1, 9999), rng.randint(1, 12), rng.randint(1, 28), rng.randint(0, 23), rng.randint(0, 59),
+                                 rng.randint(0, 59), rng.randint(0, 999999)).strftime(format)
+                for value in mutations(legal, rng):
+                    expected = parse(lambda v: datetime.strptime(v, format), value)
+                    self.assertEqual(parse(datetime_parser, value), expected, (format, value))
+                    expected = parse(lambda v: datetime.strptime(v, format).date(), value)
+                    self.assertEqual(parse(date_parser, value), expected, (format, value))
+
+    def test_edge_values(self):
+        cases = [
+            ('%Y-%m-%d', ['2024-02-29', '2023-02-29', '2024-2-9', '2024-02-09 ', '２０２４-02-09', '2024-W05']),
+            ('%Y-%m-%d %H:%M:%S', ['2024-05-01 23:59:59', '2024-05-01 24:00:00', '2024-05-01 10:00:61', '2024-05-01T10:00:00',
+                                   '2024-05-01 10:00:00.5', '2024-05-01 10:00:00+08:00', '2024-05-01 1:2:3']),
+            ('%Y-%m-%dT%H:%M', ['2024-05-01T10:00', '2024-05-01t10:00', '2024-05-01 10:00', '2024-05-01T10']),
+            ('%H:%M:%S.%f', ['10:00:00.1', '10:00:00.1234567', '10:00:00.']),
+        ]
+        for format, values in cases:
+            for value in values:
+                self.assertEqual(parse(get_datetime_parser(format), value), parse(lambda v: datetime.strptime(v, format), value), (format, value))
+
+    def test_field_types(self):
+        self.assertEqual(DatetimeType().check('2024-05-01 10:00:00'), (datetime(2024, 5, 1, 10), None))
+        self.assertEqual(DatetimeType(format='%d/%m/%Y %H:%M').check('01/05/2024 10:30'), (datetime(2024, 5, 1, 10, 30), None))
+        self.assertEqual(DateType().check('2024-05-01'), (datetime(2024, 5, 1).date(), None))
+        value, err = DatetimeType().check('2024-13-01 10:00:00')
+        self.assertIsNone(value)
+        self.assertEqual(err, "Illegal params: Not matched with datetime format '%Y-%m-%d %H:%M:%S': '2024-13-01 10:00:00'.")
+        value, err = DateType().check('2024-02-30')
+        self.assertIsNone(value)
+        self.assertEqual(err, "Illegal params: Not matched with date format '%Y-%m-%d': '2024-02-30'.")
@@ -0,0 +1,64 @@
+import json
+from unittest import mock
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TransactionTestCase
+from corelib import APIHandlerBase, APIIngressBase, pre_handler
+from corelib.api_base import db_routing
+
+
+class ReadDBHandler(APIHandlerBase):
+    @pre_handler(readonly=True)
+    def getReadDB(self):
+        self.data = db_routing._read_db.get()
+
+
+class Ingress(APIIngressBase):
+    actions = {'getReadDB': ReadDBHandler}
+
+
+@mock.patch.object(db_routing, 'ACTION_READ_REPLICAS', ['replica'])
+class AtomicBatchReadTest(TransactionTestCase):
+    """
+    Read-only actions read from a replica, except in a batch run in one transaction of the primary.
+    """
+    def tearDown(self):
+        Ingress.compile_actions()
+
+    def call_batch(self, atomic):
+        Ingress.compile_actions()  # DB routing is decided by `ACTION_READ_REPLICAS` when compiled.
+        data = {'action': 'batch', 'atomic': atomic, 'batch': [{'action': 'getReadDB'}, {'action': 'getReadDB'}]}
+        request = RequestFactory().post('/api', data=json.dumps(data), content_type='application/json')
+        request.user = AnonymousUser()
+        response = Ingress.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        return [item['data'] for item in json.loads(response.content)['data']]
+
+    def test_not_atomic(self):
+        self.assertEqual(self.call_batch(False), ['replica', 'replica'])
+
+    def test_atomic(self):
+        self.assertEqual(self.call_batch(True), ['default', 'default'])
+
+
+class WriteHandler(APIHandlerBase):
+    @pre_handler(atomic=True)
+    def setAtomic(self):
+        self.data = self.atomic
+
+    @pre_handler()
+    def setPlain(self):
+        self.data = self.atomic
+
+
+class RoutedTest(TransactionTestCase):
+    """
+    Without replicas, only write actions run in a transaction need `route_action`.
+    """
+    def test_routed(self):
+        ingress = type('Ingress', (APIIngressBase,), {'actions': {'getReadDB': ReadDBHandler, 'setAtomic': WriteHandler, 'setPlain': WriteHandler}})
+        self.assertEqual({action: record.routed for action, record in ingress._dispatch.items()},
+                         {'getReadDB': False, 'setAtomic': True, 'setPlain': False})
+        for action, atomic in [('setAtomic', True), ('setPlain', False)]:
+            (record, handler, action_func), err = ingress().load_action(action, {'action': action}, None)
+            action_func()
+            self.assertEqual(handler.data, atomic)
@@ -0,0 +1,74 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from corelib import APIHandlerBase, pre_handler, ListType, ObjectType
+
+
+class UserHandler(APIHandlerBase):
+    post_fields = {
+        'user': ObjectType(User),
+        'users': ListType(ObjectType(User)),
+        'user_ids': ListType(ObjectType(User, real_query=False)),
+        'by_name': ObjectType(User, identified_by='first_name'),
+        'by_names': ListType(ObjectType(User, identified_by='first_name')),
+    }
+
+    @pre_handler(opt=['user', 'users', 'user_ids', 'by_name', 'by_names'])
+    def check(self):
+        pass
+
+
+def call(**params):
+    handler = UserHandler(parameters=params)
+    handler.check()
+    return handler
+
+
+class ObjectTypeBatchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create(username=f'user{i}', first_name='twin' if i < 2 else f'name{i}') for i in range(20)]
+
+    def test_list_of_ids_in_one_query(self):
+        ids = [user.id for user in reversed(self.users)]
+        with self.assertNumQueries(1):
+            handler = call(users=ids)
+        self.assertTrue(handler.result, handler.error_message)
+        self.assertEqual(handler.checked_params['users'], list(reversed(self.users)))
+
+    def test_list_of_ids_without_real_query(self):
+        ids = [user.id for user in self.users]
+        with self.assertNumQueries(1):
+            handler = call(user_ids=ids)
+        self.assertTrue(handler.result, handler.error_message)
+        self.assertEqual(handler.checked_params['user_ids'], ids)
+
+    def test_fields_of_one_model_share_one_query(self):
+        with self.assertNumQueries(1):
+            handler = call(user=self.users[0].id, users=[self.users[1].id, self.users[2].id])
+        self.assertTrue(handler.result, handler.error_message)
+        self.assertEqual(handler.checked_params['user'], self.users[0])
+        self.assertEqual(handler.checked_params['users'], self.users[1:3])
+
+    def test_multiple_matches(self):
+        handler = call(by_name='twin')
+        self.assertFalse(handler.result)
+        self.assertIn("Multi data objects found by filter: 'first_name=twin'.", handler.error_message)
+
+        handler = call(by_names=['name5', 'twin'])
+        self.assertFalse(handler.result)
+        self.assertIn("Item 'twin' not matched", handler.error_message)
+
+    def test_missing_object(self):
+        handler = call(user=999)
+        self.assertFalse(handler.result)
+        self.assertIn("No data object matched by filter: 'id=999'.", handler.error_message)
+
+        handler = call(users=[self.users[0].id, 999])
+        self.assertFalse(handler.result)
+        self.assertIn("Item '999' not matched", handler.error_message)
+
+    def test_unique_by_other_field(self):
+        with self.assertNumQueries(1):
+            handler = call(by_names=['name5', 'name6'])
+        self.assertTrue(handler.result, handler.error_message)
+        self.assertEqual(handler.checked_params['by_names'], self.users[5:7])
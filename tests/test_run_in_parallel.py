@@ -0,0 +1,25 @@
+import threading
+from django.db import transaction
+from django.test import TransactionTestCase
+from corelib import APIHandlerBase
+
+
+class ThreadHandler(APIHandlerBase):
+    def getThread(self):
+        self.data = threading.get_ident()
+
+
+class RunInParallelTest(TransactionTestCase):
+    """
+    Sub-handlers run in other threads, except in a DB transaction, which connections of other threads are not in.
+    """
+    def run_sub_handlers(self):
+        handlers = APIHandlerBase().runInParallel(ThreadHandler().getThread, ThreadHandler().getThread)
+        return {handler.data for handler in handlers}
+
+    def test_parallel(self):
+        self.assertNotIn(threading.get_ident(), self.run_sub_handlers())
+
+    def test_in_transaction(self):
+        with transaction.atomic():
+            self.assertEqual(self.run_sub_handlers(), {threading.get_ident()})